@@ -0,0 +1,144 @@
+"""Measures of how hard a maze is, for screening large numbers of generated
+mazes without solving them with A_Star and walking the grid cell by cell.
+
+analyze() makes a single report per maze, from two passes over it:
+    1. The open neighbors of every cell are counted at once (with NumPy when
+       it is installed, see Grid.neighborCounts()). Cells with one open
+       neighbor are dead ends, cells with three or four are junctions.
+    2. The maze is turned into a Pathfinding.JunctionGraph, whose edges are
+       its corridors, giving the corridor-length histogram. Distances are then
+       measured on the graph, which only has a node per junction or dead end:
+       from the entrance, which gives the length of the solution and the
+       farthest cell, then from that farthest cell, which gives the diameter,
+       the longest shortest path in the maze (the double sweep).
+
+The diameter is exact for perfect mazes, whose paths form a tree, like those
+of every generator in Generation.py. For mazes with loops it is a lower bound.
+
+Usage:
+    report = Analytics.analyze(maze)
+    python Analytics.py maze1.maze maze2.maze       One JSON report per line"""
+
+import json
+import sys
+from heapq import heappush
+from heapq import heappop
+
+import MazeFile
+from Pathfinding import JunctionGraph
+
+try:
+    import numpy
+except ImportError:             #NumPy is optional; cells are counted in plain Python without it
+    numpy = None
+
+
+def countCells(maze):
+    """Counts the open cells, dead ends and junctions of [maze], and the pairs
+    of neighboring open cells. The entrance and the exit are not dead ends.
+    Returns (open cells, dead ends, junctions, open pairs)."""
+
+    grid = maze.grid
+    walls = grid.walls
+    counts = grid.neighborCounts()
+
+    if numpy is not None and isinstance(walls, bytearray):
+        isOpen = numpy.frombuffer(walls, dtype=numpy.uint8) == 0
+        neighbors = numpy.frombuffer(counts, dtype=numpy.uint8)[isOpen]
+        openCells = len(neighbors)
+        deadEnds = int(numpy.count_nonzero(neighbors == 1))
+        junctions = int(numpy.count_nonzero(neighbors >= 3))
+        pairs = int(neighbors.sum(dtype=numpy.int64)) // 2
+    else:
+        openCells = deadEnds = junctions = pairs = 0
+        for index in range(len(walls)):
+            if not walls[index]:
+                count = counts[index]
+                openCells += 1
+                pairs += count
+                if count == 1:
+                    deadEnds += 1
+                elif count >= 3:
+                    junctions += 1
+        pairs //= 2
+
+    for node in (maze.entrance, maze.exit):
+        if counts[node.index] == 1:
+            deadEnds -= 1
+    return openCells, deadEnds, junctions, pairs
+
+
+def distances(graph, start):
+    """Length of the shortest path from node [start] to every node of [graph]
+    it can reach, as a dictionary by node id (Dijkstra over the corridors)."""
+
+    reached = {start: 0}
+    toVisit = [(0, start)]
+    while toVisit:
+        distance, current = heappop(toVisit)
+        if distance > reached[current]:
+            continue                    #Outdated entry
+        for neighbor, weight, edge in graph.edges[current]:
+            neighborDistance = distance + weight
+            if neighborDistance < reached.get(neighbor, neighborDistance + 1):
+                reached[neighbor] = neighborDistance
+                heappush(toVisit, (neighborDistance, neighbor))
+    return reached
+
+
+def analyze(maze, graph=None):
+    """Report on [maze], as a dictionary that can be written as JSON:
+    -cols, rows: dimensions of the maze.
+    -open: number of open cells.
+    -deadEnds: open cells with a single open neighbor, entrance and exit excluded.
+    -junctions: open cells with three or four open neighbors.
+    -loops: number of independent loops. 0 for perfect mazes.
+    -corridors: histogram of corridor lengths, {length: count}. A corridor
+        joins two junctions, dead ends, the entrance or the exit; its length
+        is the number of steps between them.
+    -solutionLength: steps of the shortest path from the entrance to the
+        exit, or None if the exit cannot be reached.
+    -diameter: steps of the longest shortest path between two cells reached
+        from the entrance.
+    -graph: JunctionGraph or None. Graph of [maze], if already built."""
+
+    openCells, deadEnds, junctions, pairs = countCells(maze)
+    graph = graph or JunctionGraph(maze)
+
+    corridors = {}
+    for run in graph.runs:
+        corridors[len(run) + 1] = corridors.get(len(run) + 1, 0) + 1
+
+    start = graph.ids[maze.entrance.index]
+    fromEntrance = distances(graph, start)
+    farthest = max(fromEntrance, key=fromEntrance.get)
+    diameter = max(distances(graph, farthest).values())
+
+    return {
+        "cols": maze.cols,
+        "rows": maze.rows,
+        "open": openCells,
+        "deadEnds": deadEnds,
+        "junctions": junctions,
+        "loops": pairs - openCells + 1,         #Edges - nodes + 1 of a connected maze
+        "corridors": dict(sorted(corridors.items())),
+        "solutionLength": fromEntrance.get(graph.ids[maze.exit.index]),
+        "diameter": diameter,
+    }
+
+
+def main(arguments=None):
+    paths = sys.argv[1:] if arguments is None else arguments
+    if not paths:
+        print("Usage: python Analytics.py MAZE_FILE...", file=sys.stderr)
+        return 2
+
+    for path in paths:
+        report = analyze(MazeFile.load(path))
+        report["file"] = path
+        print(json.dumps(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""Benchmarks every generation and pathfinding algorithm over a ladder of maze
+sizes. Runs headless with fixed seeds, so the same maze is built on every run.
+For every algorithm and size it records the best wall time over a few repeats,
+the number of nodes expanded and the peak memory allocated, and writes the
+results as JSON. Results can be compared against a stored baseline; a run that
+is slower than the baseline by more than the tolerance counts as a regression.
+
+Usage:
+    python Benchmark.py                                 Full size ladder
+    python Benchmark.py --quick                         Small sizes only
+    python Benchmark.py --quick --save-baseline         Store a new baseline
+    python Benchmark.py --quick --add-baseline          Add new cases to the baseline
+    python Benchmark.py --sizes 51 201 --output out.json
+
+Timings depend on the machine. Store the baseline on the machine that will run
+the comparisons."""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from Maze import Maze
+import Generation
+import Pathfinding
+
+"""ADJUST BENCHMARK SETTINGS"""
+SIZES = [51, 201, 1001, 4001]                   #Width and height of every maze
+QUICK_SIZES = [51, 201]
+SEED = 2021
+REPEAT = 3                                      #Timed runs per case; the best one is kept
+TOLERANCE = 0.25                                #Allowed slowdown against the baseline
+NOISE = 0.001                                   #Slowdowns under this many seconds are ignored
+BASELINE = "Benchmarks/baseline.json"
+
+GENERATORS = {
+    "DepthFirst": Generation.DepthFirst,
+    "BinaryTree": Generation.BinaryTree,
+    "Sidewinder": Generation.Sidewinder,
+    "Eller": Generation.Eller,
+    "Kruskal": Generation.Kruskal,
+    "Prim": Generation.Prim,
+}
+
+SOLVERS = {
+    "HugRightWall": lambda maze: Pathfinding.HugRightWall(maze, False),
+    "HugLeftWall": lambda maze: Pathfinding.HugLeftWall(maze, False),
+    "A_Star": lambda maze: Pathfinding.A_Star(maze, False),
+    "A_Star(arrays)": lambda maze: Pathfinding.A_Star(maze, False, useArrays=True),
+    "BreadthFirst": lambda maze: Pathfinding.BreadthFirst(maze, False),
+    "BidirectionalBFS": lambda maze: Pathfinding.BidirectionalBFS(maze, False),
+    "JumpPointSearch": lambda maze: Pathfinding.JumpPointSearch(maze, False),
+    "LPA_Star": lambda maze: Pathfinding.LPA_Star(maze, False),
+    "JunctionSearch": lambda maze: Pathfinding.JunctionSearch(maze, False),
+    "TreeQueries": lambda maze: Pathfinding.TreeQueries(maze),
+}
+
+
+def expandedBy(algorithm, maze):
+    """Number of nodes expanded by [algorithm]. For generators, the number of
+    cells turned into paths."""
+
+    for attribute in ("expanded", "steps"):
+        if hasattr(algorithm, attribute):
+            return getattr(algorithm, attribute)
+    if isinstance(algorithm, Pathfinding.TreeQueries):
+        return len(algorithm.cells)
+    return maze.grid.walls.count(0)
+
+
+def measure(setup, execute, repeat):
+    """Runs a case [repeat] times, plus once more to measure memory.
+    -setup: function. Builds the inputs of the case. Not measured.
+    -execute: function. Runs the algorithm once on what setup returned and
+        returns the number of nodes expanded.
+    Returns a dictionary with the best time, nodes expanded and peak memory
+    allocated by execute."""
+
+    best = None
+    expanded = None
+    for i in range(repeat):
+        inputs = setup()
+        start = time.perf_counter()
+        expanded = execute(inputs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    inputs = setup()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    execute(inputs)
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    return {"seconds": best, "expanded": expanded, "peakBytes": peak}
+
+
+def benchmark(sizes, repeat, seed):
+    """Runs every case and returns the list of results."""
+
+    results = []
+
+    for size in sizes:
+        for name, generator in GENERATORS.items():
+            def setup():
+                return Maze(size, size, seed=seed)
+
+            def execute(maze, generator=generator):
+                return expandedBy(generator(maze, False, seed=seed), maze)
+
+            result = {"kind": "generation", "algorithm": name, "size": size}
+            result.update(measure(setup, execute, repeat))
+            results.append(result)
+            report(result)
+
+        maze = Maze(size, size, seed=seed)
+        Generation.DepthFirst(maze, False, seed=seed)
+        for name, solver in SOLVERS.items():
+            def setup():
+                maze.clear()
+                return maze
+
+            def execute(maze, solver=solver):
+                return expandedBy(solver(maze), maze)
+
+            result = {"kind": "solving", "algorithm": name, "size": size}
+            result.update(measure(setup, execute, repeat))
+            results.append(result)
+            report(result)
+
+    return results
+
+
+def report(result):
+    """Prints a single result."""
+
+    print("{kind:<11} {algorithm:<17} {size:>6}  {seconds:10.4f} s  {expanded:>10} nodes  {peakBytes:>12} bytes".format(**result))
+
+
+def compare(results, baseline, tolerance):
+    """Compares [results] with the results of [baseline]. Prints and returns the
+    list of regressions: cases that got slower by more than [tolerance] (and by
+    more than NOISE seconds, so tiny timings do not flap). Cases
+    that expand a different number of nodes are printed as changed."""
+
+    stored = {}
+    for result in baseline["results"]:
+        stored[(result["kind"], result["algorithm"], result["size"])] = result
+
+    regressions = []
+    for result in results:
+        old = stored.get((result["kind"], result["algorithm"], result["size"]))
+        if old is None:
+            continue
+
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] else 1.0
+        if ratio > 1 + tolerance and result["seconds"] - old["seconds"] > NOISE:
+            regressions.append(result)
+            print("REGRESSION {algorithm} {size}: {seconds:.4f} s".format(**result),
+                  "(baseline {0:.4f} s, x{1:.2f})".format(old["seconds"], ratio))
+        if result["expanded"] != old["expanded"]:
+            print("CHANGED    {algorithm} {size}: {expanded} nodes".format(**result),
+                  "(baseline {0})".format(old["expanded"]))
+
+    return regressions
+
+
+def addToBaseline(results, baseline):
+    """Appends the cases of [results] that [baseline] does not have to its
+    results, leaving the cases it has untouched, so adding an algorithm does
+    not retime every other one. Returns the number of cases added."""
+
+    stored = {(result["kind"], result["algorithm"], result["size"]) for result in baseline["results"]}
+    added = [result for result in results if (result["kind"], result["algorithm"], result["size"]) not in stored]
+    baseline["results"].extend(added)
+    return len(added)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Benchmark maze generation and pathfinding.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None, help="maze sizes to run")
+    parser.add_argument("--quick", action="store_true", help="only run the small sizes")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per case")
+    parser.add_argument("--seed", type=int, default=SEED, help="seed for every maze")
+    parser.add_argument("--output", default=None, help="file to write the results to")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--add-baseline", action="store_true", help="add cases missing from the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown, 0.25 -> 25%%")
+    options = parser.parse_args(arguments)
+
+    sizes = options.sizes or (QUICK_SIZES if options.quick else SIZES)
+    results = benchmark(sizes, options.repeat, options.seed)
+    document = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": options.seed,
+        "repeat": options.repeat,
+        "results": results,
+    }
+
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(document, file, indent=2)
+
+    if options.save_baseline:
+        with open(options.baseline, "w") as file:
+            json.dump(document, file, indent=2)
+        return 0
+
+    try:
+        with open(options.baseline) as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        print("No baseline found at", options.baseline)
+        return 0
+
+    if options.add_baseline:
+        print("Added", addToBaseline(results, baseline), "cases to", options.baseline)
+        with open(options.baseline, "w") as file:
+            json.dump(baseline, file, indent=2)
+        return 0
+
+    if compare(results, baseline, options.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Generates large numbers of mazes in parallel, for example as training data.
+
+Every maze gets its own seed, derived from a single root seed and the maze's
+position in the batch. Mazes therefore come out the same no matter how many
+worker processes are used or how work is split between them, and two batches
+with different root seeds do not share mazes.
+
+Mazes are generated headless in a ProcessPoolExecutor and returned in order,
+each one as a compact buffer in the MazeFile format (header and one bit per
+cell). Use MazeFile.loads() to turn a buffer back into a Maze."""
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from Maze import Maze
+import Generation
+import MazeFile
+
+GENERATORS = tuple(MazeFile.GENERATORS)            #Names of the generators that can be used
+
+
+def deriveSeed(seed, index):
+    """Seed of maze number [index] of a batch with root seed [seed]. A 63 bit
+    integer taken from a SHA-256 hash, so neighboring indices get unrelated seeds."""
+
+    digest = hashlib.sha256((str(seed) + ":" + str(index)).encode()).digest()
+    return int.from_bytes(digest[:8], "little") >> 1
+
+
+def generateOne(width, height, seed, generator="DepthFirst"):
+    """Generates a single maze with [seed], headless. Returns it in the MazeFile
+    format, as bytes. Raises ValueError if [seed] cannot be stored in a header."""
+
+    if generator not in GENERATORS:
+        raise ValueError("Unknown generator: " + str(generator))
+    MazeFile.checkSeed(seed)
+
+    maze = Maze(width, height, seed=seed)
+    getattr(Generation, generator)(maze, False, seed=seed)
+    return MazeFile.dumps(maze, seed, generator)
+
+
+def generateJob(job):
+    """Runs generateOne() on a (width, height, seed, generator) tuple. Used by
+    the worker processes."""
+
+    return generateOne(*job)
+
+
+def generateMany(count, width, height, seed, generator="DepthFirst", workers=None, chunksize=None):
+    """Generates [count] mazes and yields them in order, as MazeFile bytes.
+    -count: int. Number of mazes.
+    -width: int. Number of columns of every maze.
+    -height: int. Number of rows of every maze.
+    -seed: int. Root seed of the batch. Maze i is generated with deriveSeed(seed, i).
+    -generator: string. Name of the generation algorithm, one of GENERATORS.
+    -workers: int or None. Number of worker processes. None uses one per CPU;
+        1 generates in this process, without a pool.
+    -chunksize: int or None. Mazes handed to a worker at a time. None picks a
+        size that keeps every worker busy with little messaging overhead."""
+
+    if generator not in GENERATORS:
+        raise ValueError("Unknown generator: " + str(generator))
+
+    jobs = ((width, height, deriveSeed(seed, index), generator) for index in range(count))
+
+    if workers == 1:
+        for job in jobs:
+            yield generateJob(job)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, count // (workers * 8))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for data in executor.map(generateJob, jobs, chunksize=chunksize):
+            yield data
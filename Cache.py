@@ -0,0 +1,312 @@
+"""Result cache for generated mazes and solved paths, so combinations that
+come up again are not computed again.
+
+Results are stored as bytes under a key that only depends on what produced
+them, so it is the same in every process and on every run:
+    - a maze is keyed by its size, seed and generator, and stored in the
+      MazeFile format;
+    - a path is keyed by the maze's wall layout, entrance and exit and the
+      name of the solver, and stored as its first cell followed by every move
+      as a 2-bit direction, four moves per byte (see encodePath()).
+
+The cache has two levels. The most recently used results are kept in memory,
+up to maxBytes; older ones are evicted. Given a directory, results are also
+written to disk, one file per key, up to maxDiskBytes; files that have not
+been used for the longest time are deleted first. The files are listed once,
+when the cache is created, and tracked in memory from then on, so storing a
+result never scans the directory. A result found on disk is brought back
+into memory.
+
+Usage:
+    cache = ResultCache(directory="cache")
+    maze = cache.generate(201, 201, seed=7)
+    path = cache.solve(maze, "A_Star")
+    print(cache.stats())"""
+
+import hashlib
+import os
+import struct
+from collections import OrderedDict
+
+import Bulk
+import MazeFile
+import Pathfinding
+
+MAX_BYTES = 64 * 1024 * 1024                #Default size of the memory level
+MAX_DISK_BYTES = 1024 * 1024 * 1024         #Default size of the disk level
+
+MOVES = ((1, 0), (0, 1), (-1, 0), (0, -1))  #Direction 0 right, 1 down, 2 left, 3 up
+DIRECTIONS = {move: direction for direction, move in enumerate(MOVES)}
+PATH_HEADER = struct.Struct("<III")         #First cell x, y and number of moves
+
+SOLVERS = {                                 #Solvers whose paths can be cached, by name
+    "HugRightWall": Pathfinding.HugRightWall,
+    "HugLeftWall": Pathfinding.HugLeftWall,
+    "A_Star": Pathfinding.A_Star,
+    "BreadthFirst": Pathfinding.BreadthFirst,
+    "BidirectionalBFS": Pathfinding.BidirectionalBFS,
+    "JumpPointSearch": Pathfinding.JumpPointSearch,
+    "LPA_Star": Pathfinding.LPA_Star,
+    "JunctionSearch": Pathfinding.JunctionSearch,
+}
+
+
+def mazeKey(width, height, seed, generator="DepthFirst"):
+    """Key of the maze generated with these parameters. [seed] must be known,
+    otherwise the maze cannot be reproduced."""
+
+    return hashlib.sha256("maze:{}:{}:{}:{}".format(width, height, seed, generator).encode()).hexdigest()
+
+
+def pathKey(maze, solver):
+    """Key of the path found by [solver] (a string) in [maze]. Two mazes with
+    the same walls, entrance and exit share their keys, however they were made,
+    mazes opened with MazeFile.mapFile() included."""
+
+    header = struct.pack("<6I", maze.cols, maze.rows, maze.entrance.x, maze.entrance.y, maze.exit.x, maze.exit.y)
+    digest = hashlib.sha256(b"path:" + solver.encode() + b":" + header)
+    walls = maze.grid.walls
+    if isinstance(walls, MazeFile.PackedWalls):
+        digest.update(walls.packed())           #Already packed in the file
+    else:
+        digest.update(MazeFile.packWalls(walls))
+    return digest.hexdigest()
+
+
+def encodePath(path):
+    """Packs [path], a list of (x, y) tuples where every cell neighbors the
+    one before it, into bytes: PATH_HEADER, then 2 bits per move. An empty
+    path packs into empty bytes."""
+
+    if not path:
+        return b""
+
+    moves = bytearray((len(path) + 2) // 4)
+    x, y = path[0]
+    for move, (nextX, nextY) in enumerate(path[1:]):
+        direction = DIRECTIONS.get((nextX - x, nextY - y))
+        if direction is None:
+            raise ValueError("Cells " + str((x, y)) + " and " + str((nextX, nextY)) + " are not neighbors")
+        moves[move >> 2] |= direction << ((move & 3) * 2)
+        x, y = nextX, nextY
+    return PATH_HEADER.pack(path[0][0], path[0][1], len(path) - 1) + bytes(moves)
+
+
+def decodePath(data):
+    """Unpacks bytes made by encodePath() back into a list of (x, y) tuples."""
+
+    if not data:
+        return []
+
+    x, y, count = PATH_HEADER.unpack_from(data)
+    moves = memoryview(data)[PATH_HEADER.size:]
+    path = [(x, y)]
+    for move in range(count):
+        moveX, moveY = MOVES[(moves[move >> 2] >> ((move & 3) * 2)) & 3]
+        x += moveX
+        y += moveY
+        path.append((x, y))
+    return path
+
+
+class ResultCache:
+    """Two level cache of results, as bytes by key. See the module documentation."""
+
+    def __init__(self, maxBytes=MAX_BYTES, directory=None, maxDiskBytes=MAX_DISK_BYTES):
+        """
+        -maxBytes: int. Total size of the results kept in memory. Stored in self.maxBytes
+        -directory: string or None. Directory of the disk level, created if
+            needed. None keeps results in memory only. Stored in self.directory
+        -maxDiskBytes: int. Total size of the files on disk. Stored in self.maxDiskBytes
+        -self.entries: OrderedDict. Results in memory, by key, from the least to
+            the most recently used.
+        -self.bytes: int. Total size of the results in memory.
+        -self.diskFiles: OrderedDict. Size of every file on disk, by key, from
+            the least to the most recently used. Listed from the directory
+            once, here, leaving out files that are still being written.
+        -self.diskBytes: int. Total size of the files on disk.
+        -self.hits: int. Lookups answered from memory.
+        -self.diskHits: int. Lookups answered from disk.
+        -self.misses: int. Lookups that found nothing.
+        -self.evictions: int. Results evicted from memory.
+        -self.diskEvictions: int. Files deleted from disk."""
+
+        self.maxBytes = maxBytes
+        self.directory = directory
+        self.maxDiskBytes = maxDiskBytes
+
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.diskFiles = OrderedDict()
+        self.diskBytes = 0
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.diskEvictions = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            for key, size, used in sorted(self.listDisk(), key=lambda file: file[2]):
+                self.diskFiles[key] = size
+            self.diskBytes = sum(self.diskFiles.values())
+
+    def get(self, key):
+        """Result stored under [key], or None. Looks in memory, then on disk."""
+
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        if self.directory is not None:
+            path = self.diskPath(key)
+            try:
+                with open(path, "rb") as file:
+                    value = file.read()
+                os.utime(path)          #Marks the file as recently used, for the next listDisk()
+            except OSError:
+                value = None
+                self.forget(key)        #Deleted by someone else
+            if value is not None:
+                self.forget(key)        #Moved to the most recently used end, with its current size
+                self.diskFiles[key] = len(value)
+                self.diskBytes += len(value)
+                self.diskHits += 1
+                self.remember(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Stores [value], bytes, under [key], in memory and on disk."""
+
+        self.remember(key, value)
+        if self.directory is not None:
+            self.store(key, value)
+
+    def remember(self, key, value):
+        """Puts [value] in memory, evicting the least recently used results
+        until the memory level fits in maxBytes again. Results larger than
+        maxBytes are not kept in memory at all."""
+
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old)
+        if len(value) > self.maxBytes:
+            return
+
+        self.entries[key] = value
+        self.bytes += len(value)
+        while self.bytes > self.maxBytes:
+            evictedKey, evicted = self.entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+
+    def diskPath(self, key):
+        """File holding the result stored under [key]. Files are spread over
+        subdirectories named after the first two characters of their key."""
+
+        return os.path.join(self.directory, key[:2], key)
+
+    def listDisk(self):
+        """(key, size, last use) of every file of the disk level, read from the
+        directory. Temporary files, still being written, are left out."""
+
+        files = []
+        for folder in os.scandir(self.directory):
+            if folder.is_dir():
+                for entry in os.scandir(folder.path):
+                    if not entry.name.endswith(".tmp"):
+                        status = entry.stat()
+                        files.append((entry.name, status.st_size, status.st_mtime))
+        return files
+
+    def forget(self, key):
+        """Drops the file of [key] from self.diskFiles, if it is there.
+        Returns True if it was."""
+
+        size = self.diskFiles.pop(key, None)
+        if size is None:
+            return False
+        self.diskBytes -= size
+        return True
+
+    def store(self, key, value):
+        """Writes [value] to disk, then deletes the least recently used files
+        until the disk level fits in maxDiskBytes again."""
+
+        path = self.diskPath(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as file:
+            file.write(value)
+        os.replace(temporary, path)     #Readers never see a partly written file
+        self.forget(key)
+        self.diskFiles[key] = len(value)
+        self.diskBytes += len(value)
+
+        while self.diskBytes > self.maxDiskBytes:
+            oldKey = next(iter(self.diskFiles))
+            self.forget(oldKey)
+            try:
+                os.remove(self.diskPath(oldKey))
+            except OSError:
+                continue                #Already gone
+            self.diskEvictions += 1
+
+    def generate(self, width, height, seed, generator="DepthFirst"):
+        """Maze generated headless by [generator] with [seed], like
+        Bulk.generateOne(), generated only if it is not in the cache. Returns
+        a new Maze every time.
+        -seed: int. Must be known, so the maze can be reproduced."""
+
+        if seed is None:
+            raise ValueError("Only mazes with a known seed can be cached")
+
+        key = mazeKey(width, height, seed, generator)
+        data = self.get(key)
+        if data is None:
+            data = Bulk.generateOne(width, height, seed, generator)
+            self.put(key, data)
+        return MazeFile.loads(data)
+
+    def solve(self, maze, solver="A_Star"):
+        """Path from the entrance to the exit of [maze] found by [solver], the
+        name of a Pathfinding.py solver class. The solver only runs if the path
+        is not in the cache, without being drawn, and the maze is cleared
+        after it. Either way, the path is returned as a list of (x, y) tuples.
+        Raises ValueError if [solver] is not in SOLVERS."""
+
+        if solver not in SOLVERS:
+            raise ValueError("Unknown solver: " + str(solver))
+
+        key = pathKey(maze, solver)
+        data = self.get(key)
+        if data is None:
+            search = SOLVERS[solver](maze, False, run=False)
+            for event in search.events():
+                pass
+            path = search.path
+            maze.clear()
+            self.put(key, encodePath(path))
+            return list(path)
+        return decodePath(data)
+
+    def stats(self):
+        """Hit and miss counts, sizes and evictions of both levels, as a dictionary."""
+
+        lookups = self.hits + self.diskHits + self.misses
+        return {
+            "hits": self.hits,
+            "diskHits": self.diskHits,
+            "misses": self.misses,
+            "hitRate": (self.hits + self.diskHits) / lookups if lookups else 0.0,
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "evictions": self.evictions,
+            "diskBytes": self.diskBytes,
+            "diskEvictions": self.diskEvictions,
+        }
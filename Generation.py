@@ -1,82 +1,128 @@
-from random import randrange
-from pygame import time
-from random import seed
+from random import Random
+from itertools import permutations
+from array import array
+from Node import CellState
+
+try:
+    import numpy
+except ImportError:             #NumPy is optional; row generators fall back to plain Python
+    numpy = None
 
 class DepthFirst:
     """Algorithm that generates mazes by creating paths until there isn't a direction
     to move, and then backtracks until it can find another path to create. If it
     does not find a path to generate, then the whole maze has been generated.
-    -WAIT_TIME: int. The time (in ms) in between generation steps. Used to animate
-    maze generation."""
+    -STEPS_PER_FRAME: int. Number of generation steps shown in every frame. Used
+    to animate maze generation.
+    -ORDERS: tuple. All 24 permutations of the four directions. Each cell draws
+    one of them at random to decide the order in which directions are attempted."""
+
+    STEPS_PER_FRAME = 3                 #Cells carved in every frame during animation
 
-    WAIT_TIME = 5                       #Wait time between steps during animation
+    ORDERS = tuple(permutations(range(4)))  #Every order of 0 right, 1 left, 2 up, 3 down
 
-    def __init__(self, maze, animate):
+    def __init__(self, maze, animate, seed=None, run=True):
         """
         -maze: A Maze object. Stored in self.maze
         animate: Boolean. Determines whether generation steps will be shown.
-            Stored in self.animate."""
+            Stored in self.animate.
+        -seed: int or None. Seed for the random generator. None seeds from the OS.
+        -run: Boolean. If False, nothing is generated until events() is consumed.
+        -self.random: random.Random object. Generator used by this generation only.
+        -self.retries: int. Number of directions attempted that could not be
+            carved, because of an edge or an existing path.
+        -self.backtracks: int. Number of times generation stepped back to an
+            earlier cell after running out of directions."""
 
         self.maze = maze
         self.animate = animate
-        maze.render()
+        self.random = Random(seed)
+        self.retries = 0
+        self.backtracks = 0
 
-        seed()
-
-        self.generate(1, maze.entrance.y)   #Start generation next to the entrance
-        if not animate:
+        if run:
             maze.render()
+            maze.play(self.events(), animate, self.STEPS_PER_FRAME)
+            if not animate:
+                maze.render()
+            else:
+                maze.flush()
+
+    def events(self):
+        """Generates the maze, one change at a time. Yields an (index, state)
+        pair for every cell turned into a path; see Maze.play()."""
+
+        return self.generate(1, self.maze.entrance.y)   #Start generation next to the entrance
 
     def generate(self, x, y):
-        """Recursively regenerates maze. Current point is turned to a path, and
+        """Iteratively generates maze. Current point is turned to a path, and
         then attempts to make a path in all directions (up, down, left, right),
         order chosen at random. Once it cannot move, it backtracks to the last
-        point where a path can be made."""
+        point where a path can be made.
+        Backtracking uses an explicit stack instead of recursion, so long
+        corridors are not limited by Python's recursion limit. Each stack entry
+        is a single integer packing the cell, the direction order drawn for it
+        from ORDERS and how many of those directions have been attempted:
+        (y * cols + x) * 128 + order * 5 + attempted.
+        Yields an (index, state) pair for every cell turned into a path."""
 
-        current = self.maze.grid[y][x]
-        self.clearNode(current)
+        cols = self.maze.cols
+        randrange = self.random.randrange
 
-        previous = []           #Keeps track of all the directions that have been attempted
+        yield self.clearNode(x, y), CellState.PATH
+        stack = array("q", [(y * cols + x) * 128 + randrange(24) * 5])
+        retries = backtracks = 0
 
-        while len(previous) < 4:    #Checks that a path in all directions has been attempted
-            direction = randrange(0, 4) #0 right, 1 left, 2 up, 3 down
+        try:
+            while stack:
+                entry = stack[-1]
+                cell, entry = divmod(entry, 128)
+                order, attempted = divmod(entry, 5)
 
-            if direction in previous:
-                continue
+                if attempted == 4:      #A path in all directions has been attempted
+                    stack.pop()
+                    backtracks += 1
+                    continue
 
-            if direction == 0 and self.canMoveRight(x, y):
-                neighbor = self.maze.grid[y][x + 1]
-                self.clearNode(neighbor)
-                self.generate(x + 2, y)
-            elif direction == 1 and self.canMoveLeft(x, y):
-                neighbor = self.maze.grid[y][x - 1]
-                self.clearNode(neighbor)
-                self.generate(x - 2, y)
-            elif direction == 2 and self.canMoveUp(x, y):
-                neighbor = self.maze.grid[y - 1][x]
-                self.clearNode(neighbor)
-                self.generate(x, y - 2)
-            elif direction == 3 and self.canMoveDown(x, y):
-                neighbor = self.maze.grid[y + 1][x]
-                self.clearNode(neighbor)
-                self.generate(x, y + 2)
+                stack[-1] += 1
+                y, x = divmod(cell, cols)
+                direction = self.ORDERS[order][attempted]
 
-            previous.append(direction)
+                if direction == 0 and self.canMoveRight(x, y):
+                    dx, dy = 1, 0
+                elif direction == 1 and self.canMoveLeft(x, y):
+                    dx, dy = -1, 0
+                elif direction == 2 and self.canMoveUp(x, y):
+                    dx, dy = 0, -1
+                elif direction == 3 and self.canMoveDown(x, y):
+                    dx, dy = 0, 1
+                else:
+                    retries += 1
+                    continue
 
-    def clearNode(self, node):
-        """Converts [node] into a path"""
+                yield self.clearNode(x + dx, y + dy), CellState.PATH
+                yield self.clearNode(x + 2 * dx, y + 2 * dy), CellState.PATH
+                stack.append(((y + 2 * dy) * cols + x + 2 * dx) * 128 + randrange(24) * 5)
+        finally:
+            self.retries += retries
+            self.backtracks += backtracks
 
-        node.visited = True
-        node.isWall = False
+    def clearNode(self, x, y):
+        """Converts cell (x, y) into a path. Returns its grid index."""
 
-        self.changeNodeColor(node)
+        grid = self.maze.grid
+        index = y * grid.cols + x
+        grid.visited[index] = 1
+        grid.walls[index] = 0
+        grid.states[index] = CellState.PATH
+        return index
 
     def canMoveRight(self, x, y):
         """Checks if a path can be made to the right.
         Checks that the current node is not next to the right edge, and that there
         isn't already an existing path to the right."""
 
-        if (x + 1) != (self.maze.cols - 1) and not self.maze.grid[y][x + 2].visited:
+        if (x + 1) != (self.maze.cols - 1) and not self.maze.grid.visited[y * self.maze.cols + x + 2]:
             return True
         return False
 
@@ -85,7 +131,7 @@ class DepthFirst:
         Checks that the current node is not next to the left edge, and that there
         isn't already an existing path to the left."""
 
-        if not (x - 1) <= 0 and not self.maze.grid[y][x - 2].visited:
+        if not (x - 1) <= 0 and not self.maze.grid.visited[y * self.maze.cols + x - 2]:
             return True
         return False
 
@@ -94,7 +140,7 @@ class DepthFirst:
         Checks that the current node is not next to the top edge, and that there
         isn't already an existing path upwards."""
 
-        if (y - 1) != 0 and not self.maze.grid[y - 2][x].visited:
+        if (y - 1) != 0 and not self.maze.grid.visited[(y - 2) * self.maze.cols + x]:
             return True
         return False
 
@@ -103,18 +149,488 @@ class DepthFirst:
         Checks that the current node is not next to the bottom edge, and that there
         isn't already an existing path downwards."""
 
-        if (y + 1) != (self.maze.rows - 1) and not self.maze.grid[y + 2][x].visited:
+        if (y + 1) != (self.maze.rows - 1) and not self.maze.grid.visited[(y + 2) * self.maze.cols + x]:
             return True
         return False
 
-    def changeNodeColor(self, node):
-        """Changes [node]'s color. If animation is turned on (self.animation = True),
-        immediately render. Otherwise, just draw it; rendering will happen once
-        the entire maze has been rendered."""
-
-        node.color = self.maze.PATH_COLOR
-        if self.animate:
-            node.render(self.maze.surface)
-            time.wait(self.WAIT_TIME)
-        else:
-            node.draw(self.maze.surface)
+
+class SpanningTree:
+    """Base class for algorithms that carve a maze as a random spanning tree of
+    its rooms, the cells whose coordinates are both odd. Rooms are numbered
+    row by row; room r is cell (2 * (r % roomCols) + 1, 2 * (r // roomCols) + 1),
+    and the cell between two neighboring rooms is the wall that joins them.
+    State is kept in flat arrays of integers, one entry per room or edge, and
+    the work is done in loops rather than recursion, so mazes of tens of
+    millions of cells can be generated.
+    Subclasses implement carve().
+    -STEPS_PER_FRAME: int. Number of cells carved in every frame. Used to
+    animate maze generation."""
+
+    STEPS_PER_FRAME = 3
+
+    def __init__(self, maze, animate, seed=None, run=True):
+        """
+        -maze: A Maze object. Stored in self.maze
+        -animate: Boolean. Determines whether generation steps will be shown.
+            Stored in self.animate.
+        -seed: int or None. Seed for the random generator. None seeds from the OS.
+        -run: Boolean. If False, nothing is generated until events() is consumed.
+        -self.random: random.Random object. Generator used by this generation only.
+        -self.roomCols: int. Number of rooms in a row.
+        -self.roomRows: int. Number of rows of rooms."""
+
+        self.maze = maze
+        self.animate = animate
+        self.random = Random(seed)
+        self.roomCols = maze.cols // 2
+        self.roomRows = maze.rows // 2
+
+        if run:
+            maze.render()
+            maze.play(self.events(), animate, self.STEPS_PER_FRAME)
+            if not animate:
+                maze.render()
+            else:
+                maze.flush()
+
+    def events(self):
+        """Generates the maze, one change at a time. Yields an (index, state)
+        pair for every cell turned into a path; see Maze.play()."""
+
+        return self.carve()
+
+    def carve(self):
+        """Carves the maze. Yields an (index, state) pair for every cell turned
+        into a path."""
+
+        raise NotImplementedError
+
+    def roomCell(self, room):
+        """Grid index of the cell of room number [room]."""
+
+        roomY, roomX = divmod(room, self.roomCols)
+        return (2 * roomY + 1) * self.maze.cols + 2 * roomX + 1
+
+    def openCell(self, index):
+        """Converts the cell at grid index [index] into a path. Returns [index]."""
+
+        grid = self.maze.grid
+        grid.visited[index] = 1
+        grid.walls[index] = 0
+        grid.states[index] = CellState.PATH
+        return index
+
+
+class Kruskal(SpanningTree):
+    """Randomized Kruskal's algorithm. Every room starts out open and on its own.
+    The walls between neighboring rooms are then visited in a random order,
+    shuffled up front, and a wall is removed if the rooms on its two sides are
+    not connected yet. Connected rooms are tracked with a disjoint-set forest
+    held in flat arrays, with path compression and union by rank, so the whole
+    maze takes near-linear time. Results in mazes with many short dead ends and
+    no obvious bias."""
+
+    def carve(self):
+        """See SpanningTree.carve. Edges are numbered 2 * room for the wall to
+        the right of a room and 2 * room + 1 for the wall below it."""
+
+        roomCols = self.roomCols
+        rooms = roomCols * self.roomRows
+        cols = self.maze.cols
+
+        for room in range(rooms):
+            yield self.openCell(self.roomCell(room)), CellState.PATH
+
+        lastRow = rooms - roomCols
+        edges = array("i")              #Filled a row of rooms at a time, without a list of every edge
+        for start in range(0, lastRow, roomCols):
+            end = start + roomCols
+            edges.extend(range(2 * start, 2 * end - 2))     #Both walls of every room but the last one
+            edges.append(2 * end - 1)                       #Wall below the last room; the one to its right is the border
+        edges.extend(range(2 * lastRow, 2 * rooms - 2, 2))  #Walls to the right in the last row
+        self.random.shuffle(edges)
+
+        parent = array("i", range(rooms))
+        rank = bytearray(rooms)
+        joined = 1
+
+        for edge in edges:
+            if joined == rooms:
+                break                   #Every room is connected; the remaining walls stay
+
+            first = room = edge >> 1
+            other = room + (roomCols if edge & 1 else 1)
+
+            while parent[room] != room:         #Find, halving the path on the way
+                parent[room] = parent[parent[room]]
+                room = parent[room]
+            while parent[other] != other:
+                parent[other] = parent[parent[other]]
+                other = parent[other]
+            if room == other:
+                continue                #Already connected; removing the wall would make a loop
+
+            if rank[room] < rank[other]:
+                room, other = other, room
+            parent[other] = room
+            if rank[room] == rank[other]:
+                rank[room] += 1
+            joined += 1
+
+            roomY, roomX = divmod(first, roomCols)
+            wall = (2 * roomY + 1) * cols + 2 * roomX + 1 + (cols if edge & 1 else 1)
+            yield self.openCell(wall), CellState.PATH
+
+
+class Prim(SpanningTree):
+    """Randomized Prim's algorithm. The maze grows from a random room. The walls
+    between the rooms already in the maze and the rooms around them form the
+    frontier; at every step one is picked at random and, if the room behind it
+    is not in the maze yet, the wall is removed and that room joins. The
+    frontier is a flat array, and a wall is taken out of it in O(1) by moving
+    the last one into its place. Results in mazes with many short branches
+    spreading out from the first room."""
+
+    def carve(self):
+        """See SpanningTree.carve. Frontier entries are the grid indices of
+        walls, next to a room already in the maze on one side and to a room
+        that was not in it yet when the wall was added on the other side."""
+
+        cols = self.maze.cols
+        rows = self.maze.rows
+        visited = self.maze.grid.visited
+        randrange = self.random.randrange
+
+        frontier = array("q")
+        cell = self.roomCell(randrange(self.roomCols * self.roomRows))
+
+        while True:
+            yield self.openCell(cell), CellState.PATH
+
+            y, x = divmod(cell, cols)
+            if x + 2 < cols - 1 and not visited[cell + 2]:
+                frontier.append(cell + 1)
+            if y + 2 < rows - 1 and not visited[cell + 2 * cols]:
+                frontier.append(cell + cols)
+            if x > 1 and not visited[cell - 2]:
+                frontier.append(cell - 1)
+            if y > 1 and not visited[cell - 2 * cols]:
+                frontier.append(cell - cols)
+
+            cell = -1
+            while frontier and cell < 0:
+                index = randrange(len(frontier))
+                wall = frontier[index]
+                frontier[index] = frontier[-1]          #O(1) removal, order does not matter
+                frontier.pop()
+
+                if (wall // cols) % 2:                  #Odd row: rooms are left and right
+                    step = 1
+                else:
+                    step = cols
+                if not visited[wall + step]:
+                    cell = wall + step
+                elif not visited[wall - step]:
+                    cell = wall - step
+                else:
+                    continue                #Both rooms are in the maze already
+                yield self.openCell(wall), CellState.PATH
+
+            if cell < 0:
+                return
+
+
+class RowGenerator:
+    """Base class for algorithms that generate a maze one row at a time, top to
+    bottom. Only the current row of cells is ever needed, so a maze of any height
+    can be streamed with O(width) memory through generateRows(), written
+    straight to a file with write(), or built into a Maze by creating the
+    generator like any other algorithm.
+    Subclasses implement cellRows(). Where NumPy is installed, rows are built
+    with vectorized operations; otherwise plain Python is used. Both give valid
+    mazes, but the same seed gives different mazes with and without NumPy.
+    -STEPS_PER_FRAME: int. Number of rows shown in every frame. Used to animate
+    maze generation.
+    -TEXT_TABLE: bytes. Translation table from a generated row to text. Walls
+    become #'s and paths become .'s (dots)."""
+
+    STEPS_PER_FRAME = 1
+
+    TEXT_TABLE = b"." + b"#" + bytes(254)
+
+    def __init__(self, maze, animate, seed=None, run=True):
+        """
+        -maze: A Maze object. Stored in self.maze
+        -animate: Boolean. Determines whether generation steps will be shown.
+            Stored in self.animate.
+        -seed: int or None. Seed for the random generator. None seeds from the OS.
+            Stored in self.seed.
+        -run: Boolean. If False, nothing is generated until events() is consumed."""
+
+        self.maze = maze
+        self.animate = animate
+        self.seed = seed
+
+        if run:
+            maze.render()
+            if animate and maze.renderer is not None:
+                #Rows hold about cols / 2 paths each, so this shows about STEPS_PER_FRAME rows per frame
+                maze.play(self.events(), animate, self.STEPS_PER_FRAME * maze.cols / 2)
+                maze.flush()
+            else:
+                for row in self.writeRows():       #Nobody is watching, so skip the per-cell events
+                    pass
+                self.openEntranceAndExit()
+                maze.render()
+
+    def events(self):
+        """Generates the maze, one change at a time. Yields an (index, state)
+        pair for every cell turned into a path, a row at a time, and for the
+        entrance and the exit; see Maze.play(). Cells that are closed while
+        they were not shown as walls, when generating over an existing maze,
+        are yielded as walls."""
+
+        cols = self.maze.cols
+        walls = self.maze.grid.walls
+        for y, previous in self.writeRows():
+            start = y * cols
+            for index in range(start, start + cols):
+                if not walls[index]:
+                    yield index, CellState.PATH
+                elif previous[index - start] != CellState.WALL:
+                    yield index, CellState.WALL
+
+        for index in self.openEntranceAndExit():
+            yield index, CellState.ENTRANCE
+
+    def writeRows(self):
+        """Writes the rows of generateRows() into the maze's grid, top to bottom,
+        all cells of a row at once. Yields the number of every row written and
+        the states its cells had before, as bytes."""
+
+        grid = self.maze.grid
+        cols = self.maze.cols
+        for y, row in enumerate(self.generateRows(cols, self.maze.rows, self.seed)):
+            start = y * cols
+            previous = bytes(grid.states[start:start + cols])
+            grid.walls[start:start + cols] = row
+            grid.visited[start:start + cols] = row.translate(grid.VISITED_TABLE)
+            grid.states[start:start + cols] = row.translate(grid.CLEAR_TABLE)
+            yield y, previous
+
+    def openEntranceAndExit(self):
+        """Opens the entrance and the exit again, since generated rows close the
+        border. Returns their grid indices."""
+
+        for node in (self.maze.entrance, self.maze.exit):
+            node.isWall = False
+            node.state = CellState.ENTRANCE
+        return (self.maze.entrance.index, self.maze.exit.index)
+
+    @classmethod
+    def generateRows(cls, width, height, seed=None):
+        """Generates a maze one row at a time. Yields every row of the maze, top
+        to bottom, as a bytes object with one byte per column: 1 for walls and 0
+        for paths. Dimensions are made odd the same way Maze does. The entrance
+        and exit are not included.
+        -width: int. Number of columns.
+        -height: int. Number of rows.
+        -seed: int or None. Seed for the random generator. None seeds from the OS."""
+
+        cols = width + (1 - (width % 2))
+        rows = height + (1 - (height % 2))
+        cellCols = (cols - 1) // 2
+        walls = b"\x01" * cols
+
+        yield walls                             #Top border
+        for east, south in cls.cellRows(cellCols, (rows - 1) // 2, cls.random(seed)):
+            cellRow = bytearray(walls)
+            cellRow[1::2] = bytes(cellCols)
+            wallRow = bytearray(walls)
+            if numpy is not None:
+                cellRow[2:cols - 2:2] = (~east).astype(numpy.uint8).tobytes()
+                wallRow[1::2] = (~south).astype(numpy.uint8).tobytes()
+            else:
+                cellRow[2:cols - 2:2] = bytes(0 if passage else 1 for passage in east)
+                wallRow[1::2] = bytes(0 if passage else 1 for passage in south)
+            yield bytes(cellRow)
+            yield bytes(wallRow)
+
+    @classmethod
+    def write(cls, file, width, height, seed=None):
+        """Streams a maze into [file] as text, in the same format as str(Maze)
+        without spaces: one line per row, #'s for walls and .'s for paths.
+        -file: binary file object. The maze is written into it row by row."""
+
+        for row in cls.generateRows(width, height, seed):
+            file.write(row.translate(cls.TEXT_TABLE))
+            file.write(b"\n")
+
+    @staticmethod
+    def random(seed):
+        """Random number generator used by cellRows(). A NumPy Generator if
+        NumPy is installed; otherwise a random.Random object. NumPy rejects
+        negative seeds, so it is given abs(seed), like random.Random uses: every
+        generator accepts the same seeds."""
+
+        if numpy is not None:
+            return numpy.random.default_rng(abs(seed) if seed is not None else None)
+        return Random(seed)
+
+    @staticmethod
+    def draws(random, count):
+        """List of [count] random numbers between 0 and 1, drawn all at once
+        when [random] is a NumPy Generator.
+        -random: the generator returned by random()."""
+
+        if numpy is not None:
+            return random.random(count).tolist()
+        return [random.random() for i in range(count)]
+
+    @classmethod
+    def cellRows(cls, cellCols, cellRowCount, random):
+        """Generates the passages of every row of cells, top to bottom. Yields a
+        pair (east, south) per row:
+        -east: cellCols - 1 booleans. east[i] is True if cell i is joined to
+            cell i + 1.
+        -south: cellCols booleans. south[i] is True if cell i is joined to the
+            cell below it. Always False on the last row.
+        Both are NumPy boolean arrays if NumPy is installed, or lists otherwise.
+        -random: the generator returned by random()."""
+
+        raise NotImplementedError
+
+
+class BinaryTree(RowGenerator):
+    """Algorithm that generates mazes by joining every cell either to the cell on
+    its right or to the cell below it, chosen at random. Cells on the last row
+    can only go right, and cells on the last column can only go down.
+    Fast and streamable, but results in mazes biased towards the bottom-right
+    corner, with long corridors along the bottom and right edges."""
+
+    @classmethod
+    def cellRows(cls, cellCols, cellRowCount, random):
+        """See RowGenerator.cellRows."""
+
+        for row in range(cellRowCount):
+            last = row == cellRowCount - 1
+
+            if numpy is not None:
+                if last:
+                    south = numpy.zeros(cellCols, dtype=bool)
+                else:
+                    south = random.random(cellCols) < 0.5
+                    south[-1] = True
+                yield ~south[:-1], south
+            else:
+                if last:
+                    south = [False] * cellCols
+                else:
+                    south = [random.random() < 0.5 for i in range(cellCols - 1)] + [True]
+                yield [not down for down in south[:-1]], south
+
+
+class Sidewinder(RowGenerator):
+    """Algorithm that generates mazes row by row. Each row is split at random
+    into runs of joined cells, and every run is joined to the row below through
+    one of its cells, chosen at random. The last row is a single run.
+    Results in mazes with a long corridor along the bottom edge."""
+
+    @classmethod
+    def cellRows(cls, cellCols, cellRowCount, random):
+        """See RowGenerator.cellRows."""
+
+        for row in range(cellRowCount):
+            last = row == cellRowCount - 1
+
+            if numpy is not None:
+                if last:
+                    yield numpy.ones(cellCols - 1, dtype=bool), numpy.zeros(cellCols, dtype=bool)
+                    continue
+
+                close = random.random(cellCols) < 0.5       #Run ends after this cell
+                close[-1] = True
+                ends = numpy.flatnonzero(close)
+                starts = numpy.concatenate(([0], ends[:-1] + 1))
+                picks = starts + (random.random(len(ends)) * (ends - starts + 1)).astype(numpy.intp)
+                south = numpy.zeros(cellCols, dtype=bool)
+                south[picks] = True
+                yield ~close[:-1], south
+            else:
+                if last:
+                    yield [True] * (cellCols - 1), [False] * cellCols
+                    continue
+
+                east = []
+                south = [False] * cellCols
+                start = 0
+                for i in range(cellCols):
+                    if i == cellCols - 1 or random.random() < 0.5:
+                        south[random.randint(start, i)] = True
+                        start = i + 1
+                        if i != cellCols - 1:
+                            east.append(False)
+                    else:
+                        east.append(True)
+                yield east, south
+
+
+class Eller(RowGenerator):
+    """Eller's algorithm. Generates mazes row by row, keeping track of which cells
+    of the current row are already connected (their set) through the rows above.
+    Cells of different sets are joined at random; then every set is extended to
+    the row below through at least one of its cells. On the last row, all
+    remaining sets are joined. Results in mazes without an obvious bias.
+    Sets are merged with a small union-find, so each row takes O(width) time."""
+
+    @classmethod
+    def cellRows(cls, cellCols, cellRowCount, random):
+        """See RowGenerator.cellRows."""
+
+        sets = list(range(cellCols))
+        nextSet = cellCols
+
+        for row in range(cellRowCount):
+            last = row == cellRowCount - 1
+            draws = cls.draws(random, 3 * cellCols)
+            parent = {}
+
+            def find(label):
+                """Root of [label] in this row's union-find."""
+                root = label
+                while root in parent:
+                    root = parent[root]
+                while label != root:
+                    parent[label], label = root, parent[label]
+                return root
+
+            east = [False] * (cellCols - 1)
+            for i in range(cellCols - 1):
+                left = find(sets[i])
+                right = find(sets[i + 1])
+                if left != right and (last or draws[i] < 0.5):
+                    east[i] = True
+                    parent[left] = right
+
+            sets = [find(label) for label in sets]
+            south = [False] * cellCols
+
+            if not last:
+                members = {}
+                for i, label in enumerate(sets):
+                    members.setdefault(label, []).append(i)
+                for cells in members.values():
+                    forced = cells[int(draws[2 * cellCols + cells[0]] * len(cells))]
+                    for i in cells:
+                        if i == forced or draws[cellCols + i] < 0.5:
+                            south[i] = True
+
+                for i in range(cellCols):
+                    if not south[i]:
+                        sets[i] = nextSet       #Cells that did not come from above start a new set
+                        nextSet += 1
+
+            if numpy is not None:
+                yield numpy.array(east, dtype=bool), numpy.array(south, dtype=bool)
+            else:
+                yield east, south
@@ -0,0 +1,156 @@
+from Node import Node
+from Node import CellState
+
+try:
+    import numpy
+except ImportError:             #NumPy is optional; differences() compares blocks of bytes without it
+    numpy = None
+
+class Grid:
+    """Compact storage for the cells of a maze. Every cell uses three bytes, one
+    in each of the arrays below, indexed by y * cols + x. Because the arrays are
+    bytearrays they can be scanned in bulk (bytearray.count, bytes.translate,
+    numpy.frombuffer) instead of cell by cell.
+    Node views of single cells are created on demand with node(x, y), or with
+    grid[y][x] for code written against the old double array of nodes.
+    -self.walls: bytearray. 1 if the cell is a wall, 0 otherwise.
+    -self.visited: bytearray. 1 if the cell has been visited during generation.
+    -self.states: bytearray. CellState of each cell, used for drawing.
+    -CLEAR_TABLE: bytes. Translation table from walls to states. Walls become
+        CellState.WALL and everything else becomes CellState.PATH.
+    -VISITED_TABLE: bytes. Translation table from walls to visited. Paths are
+        visited, walls are not.
+    -BLOCK: int. Number of bytes differences() compares at once without NumPy."""
+
+    CLEAR_TABLE = bytes([CellState.PATH, CellState.WALL]) + bytes(254)
+    VISITED_TABLE = b"\x01" + bytes(255)
+
+    BLOCK = 4096
+
+    class Row:
+        """View of a single row of a Grid, so cells can be reached as grid[y][x]."""
+
+        __slots__ = ("grid", "y")
+
+        def __init__(self, grid, y):
+            self.grid = grid
+            self.y = y
+
+        def __getitem__(self, x):
+            if not 0 <= x < self.grid.cols:
+                raise IndexError("column out of range")
+            return Node(self.grid, x, self.y)
+
+        def __len__(self):
+            return self.grid.cols
+
+        def __iter__(self):
+            for x in range(self.grid.cols):
+                yield Node(self.grid, x, self.y)
+
+    def __init__(self, cols, rows):
+        """All cells are walls upon creation.
+        -cols: int. Number of columns. Stored in self.cols
+        -rows: int. Number of rows. Stored in self.rows"""
+
+        self.cols = cols
+        self.rows = rows
+
+        size = rows * cols
+        self.walls = bytearray(b"\x01") * size
+        self.visited = bytearray(size)
+        self.states = bytearray([CellState.WALL]) * size
+
+    def index(self, x, y):
+        """Position of cell (x, y) in the grid's arrays."""
+        return y * self.cols + x
+
+    def node(self, x, y):
+        """Creates a Node view of cell (x, y)."""
+        return Node(self, x, y)
+
+    def isWall(self, x, y):
+        """Checks if cell (x, y) is a wall."""
+        return self.walls[y * self.cols + x] == 1
+
+    def clearStates(self):
+        """Sets the state of every cell back to CellState.WALL or CellState.PATH."""
+
+        self.states[:] = self.walls.translate(Grid.CLEAR_TABLE)
+
+    def markVisited(self):
+        """Marks every path as visited and every wall as not, as generation
+        leaves them. Used for grids whose walls were filled in directly."""
+
+        self.visited[:] = self.walls.translate(Grid.VISITED_TABLE)
+
+    def neighbors(self, index):
+        """Grid indices of the four neighbors of the cell at [index], in the
+        order right, down, left, up. Neighbors that would be outside the grid
+        are given as -1."""
+
+        cols = self.cols
+        x = index % cols
+        return (index + 1 if x != cols - 1 else -1,
+                index + cols if index + cols < self.rows * cols else -1,
+                index - 1 if x != 0 else -1,
+                index - cols if index >= cols else -1)
+
+    def neighborCounts(self):
+        """Number of open cells among the four neighbors of every cell, as a
+        bytearray indexed like walls. With NumPy, counted for all cells at once
+        by adding up the open cells shifted one step in every direction."""
+
+        cols = self.cols
+        rows = self.rows
+        walls = self.walls
+
+        if numpy is not None and isinstance(walls, bytearray):
+            isOpen = 1 - numpy.frombuffer(walls, dtype=numpy.uint8).reshape(rows, cols)
+            counts = numpy.zeros((rows, cols), dtype=numpy.uint8)
+            counts[:, :-1] += isOpen[:, 1:]
+            counts[:, 1:] += isOpen[:, :-1]
+            counts[:-1, :] += isOpen[1:, :]
+            counts[1:, :] += isOpen[:-1, :]
+            return bytearray(counts.tobytes())
+
+        neighbors = self.neighbors
+        counts = bytearray(len(walls))
+        for index in range(len(walls)):
+            for neighbor in neighbors(index):
+                if neighbor >= 0 and not walls[neighbor]:
+                    counts[index] += 1
+        return counts
+
+    @staticmethod
+    def differences(first, second):
+        """Indices at which [first] and [second], two byte arrays of the same
+        length such as states, hold different values. Every byte is compared,
+        but not one at a time in Python: with NumPy, the arrays are compared
+        in one vectorized operation; without it, whole blocks of BLOCK bytes
+        are compared at once, and single bytes are only looked at inside
+        blocks that differ."""
+
+        if numpy is not None:
+            return numpy.flatnonzero(numpy.frombuffer(first, dtype=numpy.uint8) !=
+                                     numpy.frombuffer(second, dtype=numpy.uint8)).tolist()
+
+        changed = []
+        size = len(first)
+        for start in range(0, size, Grid.BLOCK):
+            end = min(start + Grid.BLOCK, size)
+            if first[start:end] != second[start:end]:
+                changed.extend([index for index in range(start, end) if first[index] != second[index]])
+        return changed
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.rows:
+            raise IndexError("row out of range")
+        return Grid.Row(self, y)
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        for y in range(self.rows):
+            yield Grid.Row(self, y)
@@ -0,0 +1,212 @@
+"""Opt-in instrumentation: phase timers and search counters, reported as JSON.
+
+Algorithms always keep a few plain integer counters of their work, which cost
+next to nothing: they count in local variables and only store the totals on
+the algorithm once it ends. A_Star counts the nodes it expands, the entries it
+pushes on its heap, the nodes it re-opens with a lower cost and the neighbors
+it checks; DepthFirst counts the directions it retries and the times it
+backtracks; a Renderer counts its draw calls and the display updates it makes.
+
+Timing is only done by a Recorder. Attach one to a maze and wrap the phases of
+a run in recorder.phase(name); the maze then adds the time spent drawing to a
+"render" phase and counts every change played on it by state. Phases do not
+overlap: time spent in a phase started inside another one (rendering inside
+solving, for example) only counts for the inner one, so the phases of a run
+add up to its total time. A maze without a recorder checks for one once per
+call and records nothing.
+
+Usage:
+    recorder = Recorder()
+    with recorder.phase("init"):
+        maze = Maze(201, 201)
+    recorder.attach(maze)
+    with recorder.phase("solve"):
+        recorder.collect("solve", Pathfinding.A_Star(maze, False))
+    recorder.write("report.json")
+
+or, for a whole headless run from the command line:
+    python Instrumentation.py --size 201 --generator DepthFirst --solver A_Star"""
+
+import argparse
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+from Maze import Maze
+from Node import CellState
+import Generation
+import Pathfinding
+
+COUNTERS = ("expanded", "pushed", "reopened", "checked", "retries", "backtracks", "steps")     #Read from algorithms
+
+GENERATORS = ("DepthFirst", "BinaryTree", "Sidewinder", "Eller", "Kruskal", "Prim")     #Take (maze, animate, seed)
+SOLVERS = ("HugRightWall", "HugLeftWall", "A_Star", "BreadthFirst", "BidirectionalBFS", "JumpPointSearch",
+           "LPA_Star", "JunctionSearch")                                            #Take (maze, animate)
+
+
+class Recorder:
+    """Collects the timers and counters of a run. See the module documentation.
+    -self.phases: dictionary. Seconds spent in every phase, by name.
+    -self.counters: dictionary. Counters collected from algorithms, by the
+        name of the phase they were collected for.
+    -self.events: dictionary. Number of changes played on the maze, by the
+        name of their CellState.
+    -self.running: list. [name, start time] of every phase in progress,
+        innermost last. Only the innermost one is being timed.
+    -self.maze: Maze object or None. Maze the recorder is attached to.
+    -self.renderBaseline: tuple. Draws and display updates its renderer had
+        already made when the maze was attached."""
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self.events = {}
+        self.running = []
+        self.maze = None
+        self.renderBaseline = (0, 0)
+
+    def attach(self, maze):
+        """Makes [maze] report its rendering and changes to this recorder.
+        Draws and display updates are counted from now on."""
+
+        self.maze = maze
+        maze.recorder = self
+        if maze.renderer is not None:
+            self.renderBaseline = (maze.renderer.draws, maze.renderer.flushes)
+
+    def detach(self):
+        """Stops the attached maze from reporting to this recorder."""
+
+        if self.maze is not None and self.maze.recorder is self:
+            self.maze.recorder = None
+
+    def begin(self, name):
+        """Starts timing phase [name], pausing the phase in progress, if any."""
+
+        now = time.perf_counter()
+        if self.running:
+            outer = self.running[-1]
+            self.phases[outer[0]] = self.phases.get(outer[0], 0.0) + now - outer[1]
+        self.running.append([name, now])
+
+    def end(self):
+        """Stops timing the innermost phase and resumes the one around it."""
+
+        now = time.perf_counter()
+        name, start = self.running.pop()
+        self.phases[name] = self.phases.get(name, 0.0) + now - start
+        if self.running:
+            self.running[-1][1] = now
+
+    @contextmanager
+    def phase(self, name):
+        """Times the body of a with statement as phase [name]. A phase can be
+        entered many times; its times add up."""
+
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def collect(self, name, algorithm):
+        """Adds the counters of [algorithm] (see COUNTERS) to the counters of
+        phase [name]. Returns [algorithm]."""
+
+        counters = self.counters.setdefault(name, {})
+        for counter in COUNTERS:
+            value = getattr(algorithm, counter, None)
+            if isinstance(value, int):
+                counters[counter] = counters.get(counter, 0) + value
+        return algorithm
+
+    def countEvents(self, events):
+        """Passes a stream of (index, state) changes through, counting them by
+        state. Used by Maze.play()."""
+
+        counts = self.events
+        for event in events:
+            name = CellState(event[1]).name
+            counts[name] = counts.get(name, 0) + 1
+            yield event
+
+    def report(self):
+        """Everything recorded so far, as a dictionary that can be written as JSON."""
+
+        counters = {name: dict(values) for name, values in self.counters.items()}
+        report = {}
+        if self.maze is not None:
+            report["maze"] = {"cols": self.maze.cols, "rows": self.maze.rows}
+            renderer = self.maze.renderer
+            if renderer is not None:
+                counters["render"] = {"draws": renderer.draws - self.renderBaseline[0],
+                                      "flushes": renderer.flushes - self.renderBaseline[1]}
+
+        report["phases"] = dict(self.phases)
+        report["total"] = sum(self.phases.values())
+        report["counters"] = counters
+        report["events"] = dict(self.events)
+        return report
+
+    def toJSON(self):
+        """report() as a JSON string."""
+
+        return json.dumps(self.report(), indent=2)
+
+    def write(self, path):
+        """Writes report() as JSON into the file at [path]."""
+
+        with open(path, "w") as file:
+            file.write(self.toJSON())
+
+
+def profile(width, height, generator="DepthFirst", solver="A_Star", seed=None, surface=None, animate=False):
+    """Generates and solves a maze with a Recorder attached, timing the init,
+    generate and solve phases, plus rendering if [surface] is given. Returns
+    the Recorder.
+    -generator: string. Name of a class of Generation.py, one of GENERATORS.
+    -solver: string. Name of a class of Pathfinding.py, one of SOLVERS.
+    -seed: int or None. Seed of the maze and of the generator.
+    -surface: pygame surface or None. None runs headless.
+    -animate: Boolean. Whether generation and solving are animated."""
+
+    recorder = Recorder()
+    with recorder.phase("init"):
+        maze = Maze(width, height, surface, seed=seed)
+    recorder.attach(maze)
+
+    with recorder.phase("generate"):
+        algorithm = getattr(Generation, generator)(maze, animate, seed=seed)
+    recorder.collect("generate", algorithm)
+
+    with recorder.phase("solve"):
+        algorithm = getattr(Pathfinding, solver)(maze, animate)
+    recorder.collect("solve", algorithm)
+
+    recorder.detach()
+    return recorder
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Time and count a headless maze generation and solve.")
+    parser.add_argument("--size", type=int, nargs="+", default=[201], help="width, or width and height")
+    parser.add_argument("--generator", default="DepthFirst", choices=GENERATORS, help="generation algorithm")
+    parser.add_argument("--solver", default="A_Star", choices=SOLVERS, help="pathfinding algorithm")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the maze")
+    parser.add_argument("--output", default=None, help="file to write the report to, instead of printing it")
+    options = parser.parse_args(arguments)
+
+    width = options.size[0]
+    height = options.size[1] if len(options.size) > 1 else width
+    recorder = profile(width, height, options.generator, options.solver, options.seed)
+
+    if options.output:
+        recorder.write(options.output)
+    else:
+        print(recorder.toJSON())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,44 +1,82 @@
-from Node import Node
-from random import randrange
-from random import seed
-from pygame import Color
-from pygame import display
+from Grid import Grid
+from Node import CellState
+from random import Random
 
 class Maze:
-    """Used to represent a maze board.
-    -WALL_COLOR: pygame Color object. Color used for all walls.
-    -PATH_COLOR: pygame Color object. Color used for all paths.
-    -ENTRANCE_COLOR: pygame Color object. Color used for the entrance and exit."""
+    """Used to represent a maze board. Cells are stored in a compact Grid.
+    Rendering is optional: a maze created without a surface has no Renderer,
+    and everything that would be drawn is skipped, so algorithms run headless
+    without pygame.
+    -CELL_TEXT: tuple of strings. Text of a path and of a wall in str(maze)."""
 
-    WALL_COLOR = Color(100, 100, 100)               #Dark Gray
-    PATH_COLOR = Color(255, 255, 255)               #White
-    ENTRANCE_COLOR = Color(255, 0, 0)               #Red
+    CELL_TEXT = (" . ", " # ")
 
-    def __init__(self, width, height, surface):
+    def __init__(self, width, height, surface=None, seed=None):
         """
         -height: int. number of rows the maze will have. Stored in self.rows
         -width: int. number of columns the maze will have. Stored in self.cols
-        -surface: pygame surface. Used for rendering. Stored in self.surface
-        -self.grid: a double array used to store all nodes."""
+        -surface: pygame surface or None. Used for rendering. Stored in self.surface
+        -seed: int or None. Seed used to place the entrance and exit. None seeds
+            from the OS.
+        -self.random: random.Random object. Generator used by this maze only, so
+            mazes never reseed or share Python's global generator.
+        -self.grid: a Grid object used to store all cells.
+        -self.renderer: Renderer object, or None if the maze is headless.
+        -self.edits: list of ints. Grid indices of the cells changed by setWall()
+            since the maze was created or reset, oldest first.
+        -self.recorder: Instrumentation.Recorder object or None. Times rendering
+            and counts the changes played on this maze. None, the default,
+            records nothing; see Instrumentation.py."""
 
         self.rows = height + (1 - (height % 2))
         self.cols = width + (1 - (width % 2))
-        self.grid = []
-        self.surface = surface
+        self.grid = None
+        self.recorder = None
+        self.attach(surface)
 
-        seed()
+        self.random = Random(seed)
+        self.edits = []
 
         self.initialize()
         self.createEntranceAndExit()
 
+    @classmethod
+    def fromGrid(cls, grid, entrance, exit, surface=None):
+        """Creates a maze around an existing grid, for example one that was loaded
+        from a file, instead of a grid of walls.
+        -grid: Grid object. Stored in self.grid
+        -entrance: tuple. (x, y) coordinates of the entrance.
+        -exit: tuple. (x, y) coordinates of the exit.
+        -surface: pygame surface or None. Used for rendering."""
+
+        maze = cls.__new__(cls)
+        maze.random = Random()
+        maze.edits = []
+        maze.recorder = None
+        maze.rows = grid.rows
+        maze.cols = grid.cols
+        maze.grid = grid
+        maze.attach(surface)
+        maze.placeEntranceAndExit(entrance, exit)
+        maze.clear()
+        return maze
+
+    def attach(self, surface):
+        """Sets the surface the maze is rendered on, and creates its Renderer.
+        -surface: pygame surface or None. Stored in self.surface. None makes
+            the maze headless."""
+
+        self.surface = surface
+        self.renderer = None
+
+        if surface is not None:
+            from Renderer import Renderer       #Only headed mazes need pygame
+            self.renderer = Renderer(surface)
+
     def initialize(self):
-        """Creates a double array of nodes. All nodes are walls upon creation."""
+        """Creates the grid of cells. All cells are walls upon creation."""
 
-        for i in range(self.rows):
-            self.grid.append([])
-            for j in range(self.cols):
-                node = Node(j, i, Maze.WALL_COLOR)
-                self.grid[i].append(node)
+        self.grid = Grid(self.cols, self.rows)
 
     def createEntranceAndExit(self):
         """Creates an entrance and an exit. Entrance is on the left side of the
@@ -46,61 +84,173 @@ class Maze:
         Both entrance and exit are saved as class attributes for future algorithm
         reference."""
 
-        entrance = randrange(0, self.rows // 2) * 2
+        entrance = self.random.randrange(0, self.rows // 2) * 2
         entrance += 1
-        self.entrance = self.grid[entrance][0]
-        self.entrance.isWall = False
 
-        exit = randrange(0, self.rows // 2) * 2
+        exit = self.random.randrange(0, self.rows // 2) * 2
         exit += 1
-        self.exit = self.grid[exit][self.cols - 1]
-        self.exit.isWall = False
 
-        self.entrance.color = Maze.ENTRANCE_COLOR
-        self.exit.color = Maze.ENTRANCE_COLOR
+        self.placeEntranceAndExit((0, entrance), (self.cols - 1, exit))
+
+    def placeEntranceAndExit(self, entrance, exit):
+        """Turns the given cells into the entrance and the exit.
+        -entrance: tuple. (x, y) coordinates of the entrance.
+        -exit: tuple. (x, y) coordinates of the exit."""
+
+        self.entrance = self.grid.node(entrance[0], entrance[1])
+        self.exit = self.grid.node(exit[0], exit[1])
+
+        for node in (self.entrance, self.exit):
+            if node.isWall:                     #Read-only grids already have them open
+                node.isWall = False
+            node.state = CellState.ENTRANCE
+
+
+    def setWall(self, x, y, wall=True):
+        """Closes or opens cell (x, y) after generation, for example from an
+        editor. Changed cells are recorded in self.edits, so solvers that keep
+        their search can repair it instead of starting over, and drawn right
+        away if the maze has a renderer.
+        -wall: Boolean. True turns the cell into a wall, False into a path.
+        Raises ValueError for cells outside the interior of the maze, since the
+        border must stay closed, and for the entrance and the exit, which must
+        stay open."""
+
+        self.checkInterior(x, y)
+        index = self.grid.index(x, y)
+        if index == self.entrance.index or index == self.exit.index:
+            raise ValueError("The entrance and the exit cannot be walls")
+        if self.grid.walls[index] == wall:
+            return
+
+        state = CellState.WALL if wall else CellState.PATH
+        self.grid.walls[index] = 1 if wall else 0
+        self.grid.visited[index] = 0 if wall else 1
+        self.grid.states[index] = state
+        self.edits.append(index)
 
+        if self.renderer is not None:
+            self.renderer.queueCell(x, y, state)
+            self.renderer.flush()
+
+    def toggleWall(self, x, y):
+        """Opens cell (x, y) if it is a wall, or closes it otherwise. See setWall()."""
+
+        self.checkInterior(x, y)
+        self.setWall(x, y, not self.grid.isWall(x, y))
+
+    def checkInterior(self, x, y):
+        """Raises ValueError unless cell (x, y) is inside the border of the
+        maze, that is 1 <= x <= cols - 2 and 1 <= y <= rows - 2."""
+
+        if not (0 < x < self.cols - 1 and 0 < y < self.rows - 1):
+            raise ValueError("Cell " + str((x, y)) + " is not inside the border of the maze")
 
     def reset(self):
-        """Turns all paths back to walls and generates a new entrance and exit."""
+        """Turns all paths back to walls and generates a new entrance and exit.
+        Only the cells that were open are drawn again; see render()."""
 
-        for row in self.grid:
-            for node in row:
-                node.isWall = True
-                node.visited = False
+        size = self.rows * self.cols
+        self.grid.walls[:] = bytearray(b"\x01") * size
+        self.grid.visited[:] = bytearray(size)
+        self.edits = []
         self.createEntranceAndExit()
         self.clear()
 
     def clear(self):
-        """Clears the maze after traversal. Changes colors back to normal."""
-
-        for row in self.grid:
-            for node in row:
-                if node.isWall:
-                    node.color = self.WALL_COLOR
-                else:
-                    if node == self.entrance or node == self.exit:
-                        node.color = self.ENTRANCE_COLOR
-                    else:
-                        node.color = self.PATH_COLOR
+        """Clears the maze after traversal. Changes colors back to normal.
+        States are restored in bulk, and only the cells the traversal changed
+        are drawn again; see render()."""
+
+        self.grid.clearStates()
+        self.entrance.state = CellState.ENTRANCE
+        self.exit.state = CellState.ENTRANCE
 
         self.render()
 
-    def render(self):
-        """Draws all nodes and renders at the end."""
+    def render(self, full=False):
+        """Brings the drawing of the maze up to date and renders it. Only cells
+        whose state changed since they were last drawn are drawn again. They
+        are found by comparing every state to the last drawn one, a vectorized
+        pass over the whole grid; see Grid.differences().
+        Does nothing if the maze is headless.
+        -full: Boolean. If True, every cell is drawn, for example after the
+            surface was drawn over by something else."""
+
+        if self.renderer is not None:
+            if self.recorder is not None:
+                self.recorder.begin("render")
+            if full:
+                self.renderer.renderGrid(self.grid)
+            else:
+                self.renderer.renderChanges(self.grid)
+            if self.recorder is not None:
+                self.recorder.end()
+
+    def setView(self, x, y, cellWidth=None):
+        """Scrolls the drawing so that cell (x, y) is in the top left corner of
+        the surface, and zooms it, for mazes larger than the surface. Redraws
+        the maze. Does nothing if the maze is headless.
+        -cellWidth: int or None. Width and height of a cell, in pixels. None
+            keeps the current one, Node.NODE_WIDTH by default."""
+
+        if self.renderer is not None:
+            self.renderer.setView(x, y, cellWidth)
+            self.render()
+
+    def flush(self):
+        """Renders the cells changed since the last frame. Used at the end of
+        an animation. Does nothing if the maze is headless."""
+
+        if self.renderer is not None:
+            if self.recorder is not None:
+                self.recorder.begin("render")
+            self.renderer.flush()
+            if self.recorder is not None:
+                self.recorder.end()
+
+    def play(self, events, animate, stepsPerFrame=1, weights=None):
+        """Consumes a stream of changes made by an algorithm, as returned by its
+        events(). Every change is an (index, state) pair: the cell at grid index
+        [index] was given CellState [state]. The algorithm has already stored
+        the state in the grid, so without animation (or a renderer) the stream
+        is only drained, as fast as the algorithm runs.
+        -animate: Boolean. If True, every change is drawn and counted as an
+            animation step, and frames are shown as they fill up.
+        -stepsPerFrame: double. Steps shown in every frame.
+        -weights: dictionary or None. How much a change to each state counts as
+            a step. States that are not in it count as 1.
+        With a recorder, changes are counted by state and the time spent
+        drawing them is recorded as rendering."""
+
+        recorder = self.recorder
+        if recorder is not None:
+            events = recorder.countEvents(events)
+
+        if not animate or self.renderer is None:
+            for event in events:
+                pass
+            return
 
-        for row in self.grid:
-            for node in row:
-                node.draw(self.surface)
-        display.update()
+        renderer = self.renderer
+        cols = self.cols
+        weights = weights or {}
+        for index, state in events:
+            if recorder is not None:
+                recorder.begin("render")
+            renderer.queueCell(index % cols, index // cols, state)
+            renderer.step(stepsPerFrame, weights.get(state, 1))
+            if recorder is not None:
+                recorder.end()
 
     def __str__(self):
         """String representation of maze. Walls are represented by #'s. Paths are
         represented by .'s (dots).
         Mainly used for debugging."""
 
-        string = ""
-        for row in self.grid:
-            for node in row:
-                string += str(node)
-            string += "\n"
-        return string
+        walls = self.grid.walls
+        rows = []
+        for y in range(self.rows):
+            start = y * self.cols
+            rows.append("".join([Maze.CELL_TEXT[walls[index]] for index in range(start, start + self.cols)]))
+        return "\n".join(rows) + "\n"
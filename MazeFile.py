@@ -0,0 +1,310 @@
+"""Binary maze file format. A file is a fixed size header followed by the walls
+of the maze, one bit per cell:
+
+    HEADER: 64 bytes, little endian
+        magic       4 bytes     b"MAZE"
+        version     uint16      VERSION
+        generator   uint16      id of the generation algorithm, see GENERATORS
+        flags       uint32      bit 0 is set if the seed is known
+        cols        uint32
+        rows        uint32
+        entranceX   uint32
+        entranceY   uint32
+        exitX       uint32
+        exitY       uint32
+        seed        int64
+        (zero padding up to 64 bytes)
+    WALLS: ceil(rows * cols / 8) bytes
+        Bit (i % 8) of byte (i // 8) is 1 if the cell at index i = y * cols + x
+        is a wall.
+
+save() writes a Maze. load() reads a file back into a regular, editable Maze.
+dumps() and loads() do the same with bytes instead of files.
+mapFile() opens a file through mmap instead: nothing is decoded up front, so
+even a huge maze opens instantly, and the walls of a cell are only read from
+the file when a solver looks at them."""
+
+import mmap
+import struct
+
+from Grid import Grid
+from Maze import Maze
+from Node import CellState
+
+try:
+    import numpy
+except ImportError:             #NumPy is optional; walls are packed in plain Python without it
+    numpy = None
+
+MAGIC = b"MAZE"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIIIIIq")
+HEADER_SIZE = 64
+SEED_KNOWN = 1
+SEED_RANGE = range(-2 ** 63, 2 ** 63)      #Seeds that fit in the header's int64
+
+GENERATORS = {"DepthFirst": 1, "BinaryTree": 2, "Sidewinder": 3, "Eller": 4, "Kruskal": 5, "Prim": 6}     #0 -> unknown
+
+
+def checkSeed(seed):
+    """Raises ValueError unless [seed] can be stored in a header: None, or an
+    integer in SEED_RANGE."""
+
+    if seed is not None and (not isinstance(seed, int) or seed not in SEED_RANGE):
+        raise ValueError("Seed must be a 64 bit integer to be stored: " + repr(seed))
+
+
+class MazeHeader:
+    """Contents of the header of a maze file.
+    -cols: int. Number of columns.
+    -rows: int. Number of rows.
+    -entrance: tuple. (x, y) coordinates of the entrance.
+    -exit: tuple. (x, y) coordinates of the exit.
+    -seed: int or None. Seed the maze was generated with, if known.
+    -generator: string or None. Name of the generation algorithm, if known."""
+
+    def __init__(self, cols, rows, entrance, exit, seed=None, generator=None):
+        self.cols = cols
+        self.rows = rows
+        self.entrance = entrance
+        self.exit = exit
+        self.seed = seed
+        self.generator = generator
+
+    def pack(self):
+        """Header as bytes, padded to HEADER_SIZE. Raises ValueError if the
+        seed is not None or a 64 bit integer; see checkSeed()."""
+
+        checkSeed(self.seed)
+        flags = SEED_KNOWN if self.seed is not None else 0
+        header = HEADER.pack(MAGIC, VERSION, GENERATORS.get(self.generator, 0), flags,
+                             self.cols, self.rows, self.entrance[0], self.entrance[1],
+                             self.exit[0], self.exit[1], self.seed if self.seed is not None else 0)
+        return header + bytes(HEADER_SIZE - len(header))
+
+    def fileSize(self):
+        """Size in bytes of a maze file with this header: the header and the
+        walls of cols * rows cells."""
+
+        return HEADER_SIZE + (self.cols * self.rows + 7) // 8
+
+    @classmethod
+    def unpack(cls, data):
+        """Reads a header from the first HEADER_SIZE bytes of [data], the whole
+        maze file. Raises ValueError if [data] is not a maze file, if it is too
+        short to hold the walls of every cell, or if the entrance or the exit
+        is not an open cell of the maze."""
+
+        if len(data) < HEADER_SIZE:
+            raise ValueError("File is too short to be a maze file")
+        (magic, version, generator, flags, cols, rows, entranceX, entranceY,
+         exitX, exitY, seed) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a maze file")
+        if version != VERSION:
+            raise ValueError("Unsupported maze file version: " + str(version))
+
+        names = {id: name for name, id in GENERATORS.items()}
+        header = cls(cols, rows, (entranceX, entranceY), (exitX, exitY),
+                     seed if flags & SEED_KNOWN else None, names.get(generator))
+        if len(data) < header.fileSize():
+            raise ValueError("File is too short for a " + str(cols) + "x" + str(rows) + " maze")
+
+        walls = PackedWalls(data, cols * rows)
+        for name, (x, y) in (("entrance", header.entrance), ("exit", header.exit)):
+            if x >= cols or y >= rows:
+                raise ValueError("The " + name + " " + str((x, y)) + " is outside the maze")
+            if walls[y * cols + x]:
+                raise ValueError("The " + name + " " + str((x, y)) + " is a wall")
+        return header
+
+
+def packWalls(walls):
+    """Packs a bytearray of 0's and 1's into bits, 8 cells per byte."""
+
+    if numpy is not None:
+        return numpy.packbits(numpy.frombuffer(walls, dtype=numpy.uint8), bitorder="little").tobytes()
+
+    size = len(walls)
+    padded = bytes(walls) + bytes(-size % 8)
+    packed = bytearray(len(padded) // 8)
+    for i in range(len(packed)):
+        eight = int.from_bytes(padded[i * 8:i * 8 + 8], "little")
+        packed[i] = ((eight * 0x0102040810204080) >> 56) & 0xFF     #Gathers the low bit of every byte
+    return bytes(packed)
+
+
+def unpackWalls(packed, size):
+    """Unpacks the bits made by packWalls() into a bytearray of [size] 0's and 1's."""
+
+    if numpy is not None:
+        bits = numpy.unpackbits(numpy.frombuffer(packed, dtype=numpy.uint8), count=size, bitorder="little")
+        return bytearray(bits.tobytes())
+
+    walls = bytearray(size)
+    for index in range(size):
+        walls[index] = (packed[index >> 3] >> (index & 7)) & 1
+    return walls
+
+
+def dumps(maze, seed=None, generator=None):
+    """[maze] in the maze file format, as bytes.
+    -seed: int or None. Seed the maze was generated with, if known. Must fit
+        in 64 bits; see checkSeed().
+    -generator: string or None. Name of the generation algorithm, if known."""
+
+    header = MazeHeader(maze.cols, maze.rows, (maze.entrance.x, maze.entrance.y),
+                        (maze.exit.x, maze.exit.y), seed, generator)
+    return header.pack() + packWalls(maze.grid.walls)
+
+
+def loads(data, surface=None):
+    """Reads a maze from bytes in the maze file format into a new Maze, decoding
+    every cell. The file's header is available as maze.header. Raises
+    ValueError if [data] is not a valid maze file; see MazeHeader.unpack().
+    -surface: pygame surface or None. Used for rendering."""
+
+    header = MazeHeader.unpack(data)
+
+    grid = Grid(header.cols, header.rows)
+    grid.walls[:] = unpackWalls(memoryview(data)[HEADER_SIZE:], header.rows * header.cols)
+    grid.markVisited()
+
+    maze = Maze.fromGrid(grid, header.entrance, header.exit, surface)
+    maze.header = header
+    return maze
+
+
+def save(maze, path, seed=None, generator=None):
+    """Writes [maze] into the file at [path]. See dumps()."""
+
+    with open(path, "wb") as file:
+        file.write(dumps(maze, seed, generator))
+
+
+def load(path, surface=None):
+    """Reads the file at [path] into a new Maze. See loads()."""
+
+    with open(path, "rb") as file:
+        return loads(file.read(), surface)
+
+
+def mapFile(path):
+    """Opens the file at [path] through mmap, without decoding it. Returns a
+    headless, read-only Maze whose grid reads walls straight from the file.
+    The maze's header is available as maze.header. Raises ValueError if the
+    file is not a valid maze file; see MazeHeader.unpack()."""
+
+    with open(path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        header = MazeHeader.unpack(buffer)
+    except ValueError:
+        buffer.close()
+        raise
+
+    maze = Maze.fromGrid(MappedGrid(buffer, header.cols, header.rows), header.entrance, header.exit)
+    maze.header = header
+    return maze
+
+
+class PackedWalls:
+    """Read-only view of the wall bits of a mapped maze file. Indexed like
+    Grid.walls; each lookup reads a single byte of the file."""
+
+    def __init__(self, buffer, size):
+        """
+        -buffer: mmap object or bytes. The whole maze file, at least
+            MazeHeader.fileSize() bytes long.
+        -size: int. Number of cells."""
+
+        self.buffer = buffer
+        self.size = size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("cell index out of range")
+        return (self.buffer[HEADER_SIZE + (index >> 3)] >> (index & 7)) & 1
+
+    def __len__(self):
+        return self.size
+
+    def packed(self):
+        """The walls packed as packWalls() packs them, read straight from the
+        file instead of being unpacked and packed again. Bits past the last
+        cell are left out, as packWalls() leaves them 0."""
+
+        packed = bytearray(self.buffer[HEADER_SIZE:HEADER_SIZE + (self.size + 7) // 8])
+        if self.size % 8:
+            packed[-1] &= (1 << (self.size % 8)) - 1
+        return bytes(packed)
+
+    def count(self, value):
+        """Number of cells equal to [value] (0 or 1), counting set bits a large
+        chunk of the file at a time."""
+
+        walls = 0
+        chunk = 1 << 20
+        end = HEADER_SIZE + (self.size + 7) // 8
+        for start in range(HEADER_SIZE, end, chunk):
+            walls += bin(int.from_bytes(self.buffer[start:min(start + chunk, end)], "little")).count("1")
+        return walls if value == 1 else self.size - walls
+
+
+class SparseCells:
+    """Mutable per-cell values that are only stored once they are written.
+    Cells that were never written read as default(index)."""
+
+    def __init__(self, size, default):
+        """
+        -size: int. Number of cells.
+        -default: function. Value of a cell that was never written."""
+
+        self.size = size
+        self.default = default
+        self.values = {}
+
+    def __getitem__(self, index):
+        value = self.values.get(index)
+        if value is None:
+            return self.default(index)
+        return value
+
+    def __setitem__(self, index, value):
+        self.values[index] = value
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        """Forgets every written value."""
+
+        self.values.clear()
+
+
+class MappedGrid(Grid):
+    """Grid whose walls are read lazily from a mapped maze file. Walls are
+    read-only. Generation visits and display states are only stored for cells
+    that get written, so solving touches memory in proportion to the cells it
+    explores, not to the size of the maze."""
+
+    def __init__(self, buffer, cols, rows):
+        """
+        -buffer: mmap object. The whole maze file.
+        -cols: int. Number of columns. Stored in self.cols
+        -rows: int. Number of rows. Stored in self.rows"""
+
+        self.cols = cols
+        self.rows = rows
+
+        size = rows * cols
+        self.walls = PackedWalls(buffer, size)
+        self.visited = SparseCells(size, lambda index: 1 - self.walls[index])
+        self.states = SparseCells(size, lambda index: CellState.WALL if self.walls[index] else CellState.PATH)
+
+    def clearStates(self):
+        """Sets the state of every cell back to CellState.WALL or CellState.PATH."""
+
+        self.states.clear()
@@ -1,43 +1,74 @@
-import pygame
+from enum import IntEnum
+
+class CellState(IntEnum):
+    """Display state of a cell. Stored as a single byte per cell in Grid.states.
+    Renderer.PALETTE maps every state to the color it is drawn with."""
+
+    WALL = 0            #Maze walls
+    PATH = 1            #Maze halls
+    ENTRANCE = 2        #Entrance and exit
+    CURRENT = 3         #Algorithm's current position
+    TO_VISIT = 4        #Cells in line to be evaluated
+    VISITED = 5         #Cells previously visited by an algorithm
+    SOLUTION = 6        #Path from the entrance to the exit
 
 class Node:
-    """Node class handles each cell's rendering and drawing.
-    -NODE_WIDTH: int. The width (in pixels) of all nodes."""
+    """Node class is a view of a single cell of a Grid. It does not store the
+    cell's state itself; reading or writing its attributes reads or writes the
+    grid's arrays. Nodes are only created when a caller asks for one.
+    -NODE_WIDTH: int. The width (in pixels) of all nodes when rendered."""
 
     NODE_WIDTH = 20
 
-    def __init__(self, x, y, color):
+    __slots__ = ("grid", "x", "y", "index")
+
+    def __init__(self, grid, x, y):
         """
+        -grid: Grid object. Grid that stores the cell's state. Stored in self.grid
         -x: int. Represents column in which the node is found. Stored in self.x
         -y: int. Represents row in which the node is found. Stored in self.y
-        -color: pygame Color object. Node's color.
-        -self.visited: Boolean. Represents whether a node has been visited during
-            generation.
-        -self.isWall: Boolean. Represents whether a node is a wall."""
+        -self.index: int. Position of the cell in the grid's arrays."""
 
+        self.grid = grid
         self.x = x
         self.y = y
-        self.color = color
+        self.index = y * grid.cols + x
+
+    @property
+    def visited(self):
+        """Boolean. Represents whether a node has been visited during generation."""
+        return self.grid.visited[self.index] == 1
+
+    @visited.setter
+    def visited(self, value):
+        self.grid.visited[self.index] = 1 if value else 0
+
+    @property
+    def isWall(self):
+        """Boolean. Represents whether a node is a wall."""
+        return self.grid.walls[self.index] == 1
 
-        self.visited = False
-        self.isWall = True
+    @isWall.setter
+    def isWall(self, value):
+        self.grid.walls[self.index] = 1 if value else 0
 
-    def draw(self, surface):
-        """Draws node into the screen. Does NOT render it. Node will be shown
-        next time the display is updated. The location at which the node is drawn
-        depends on it's x and y coordinates.
-        -surface: pygame Surface object. Used to draw the node."""
+    @property
+    def state(self):
+        """CellState. Determines the color the node is drawn with."""
+        return CellState(self.grid.states[self.index])
 
-        rectangle = pygame.Rect((self.x * Node.NODE_WIDTH, self.y * Node.NODE_WIDTH), (Node.NODE_WIDTH, Node.NODE_WIDTH))
-        pygame.draw.rect(surface, self.color, rectangle)
-        pygame.event.pump()
+    @state.setter
+    def state(self, value):
+        self.grid.states[self.index] = value
 
-    def render(self, surface):
-        """Draws the node and immediately renders it.
-        -surface: pygame Surface object. Used to render."""
+    def __eq__(self, other):
+        """Two nodes are equal if they view the same cell of the same grid."""
+        if not isinstance(other, Node):
+            return NotImplemented
+        return self.grid is other.grid and self.index == other.index
 
-        self.draw(surface)
-        pygame.display.update()
+    def __hash__(self):
+        return hash(self.index)
 
     def __str__(self):
         """String representation of Node. If it's a wall, node is represented by
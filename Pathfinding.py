@@ -1,311 +1,536 @@
 from Maze import Maze
-from pygame import Color
-from pygame import time
+from heapq import heappush
+from heapq import heappop
+from heapq import heapify
+from array import array
+from collections import deque
+from weakref import WeakKeyDictionary
 from Node import Node
+from Node import CellState
 
-"""*****************************HUGH RIGHT-WALL-METHOD****************************"""
-class HugRightWall:
-    """Algorithm that traverses a maze by prioritizing right turns. Move higherchy
-    goes as right_turn > moving_forward > left_turn > moving_backwards.
-    -PATH_COLOR: pygame Color object. Used for path from the entrance to the exit.
-    -VISITED_COLOR: pygame Color object. Used for visited nodes that are not in
-        direct path from the entrance to the exit.
-    -CURRENT_COLOR: pygame Color object. Used to show the algorithm's current position.
-    -WAIT_TIME: int. The time (in ms) in between generation steps. Used to animate
-    maze traversal."""
-
-    PATH_COLOR = Color(0, 0, 200)
-    VISITED_COLOR = Color(0, 200, 150)
-    CURRENT_COLOR = Color(255, 140, 0)
-
-    WAIT_TIME = 20
-
-    def __init__(self, maze, animate):
-        """
-        -maze: Maze object. Maze to be traversed. Stored in self.maze.
-        -animate: Boolean. Determines whether pathfinding process will be shown.
-            stored in self.animate.
-        self.currentX: int. Represents algorithm's current column in the maze.
-        self.currentY: int. Represents algorithm's current row in the maze.
-        self.path: array. Represents all the nodes in the bath from the entrance
-            to the exit."""
-        self.maze = maze
-        self.animate = animate
-
-        self.currentX = maze.entrance.x
-        self.currentY = maze.entrance.y
-        self.path = []
-
-        self.traverse()
-
-        if not animate:
-            maze.render()
+try:
+    import numpy
+except ImportError:             #NumPy is optional; TreeQueries and JunctionGraph fall back to plain Python
+    numpy = None
 
-    def traverse(self):
-        """Continues maze wandering until the exit has been found.
-        Changes current node's color to [CURRENT_COLOR], and then makes the next
-        possible move."""
+INFINITY = float("inf")
 
-        move = self.moveRight
+"""*********************************SOLVER BASE***********************************"""
+class Solver:
+    """Base class for the algorithms that solve a maze from its entrance to its
+    exit. Subclasses implement events(), and call play() from their constructor
+    when they are asked to run.
+    -WEIGHTS: dictionary. How much a change to each state counts as an
+        animation step; see Maze.play(). The path counts half, so it is drawn
+        faster than the search.
+    -STEPS_PER_FRAME: int. Number of pathfinding steps shown in every frame. Used
+    to animate maze traversal."""
 
-        while self.maze.grid[self.currentY][self.currentX] != self.maze.exit:
+    WEIGHTS = {CellState.SOLUTION: .5}
 
-            self.changeNodeColor(self.maze.grid[self.currentY][self.currentX], self.CURRENT_COLOR)
+    STEPS_PER_FRAME = 1
 
-            move = self.nextMove(move)
-            move()
+    def events(self):
+        """Searches for the path and shows it. Yields an (index, state) pair
+        for every change; see Maze.play()."""
 
-        self.createPath()
+        raise NotImplementedError
 
-    def move(self):
-        """Takes care of adding and removing coordinates (represented as tuples)
-        from self.path.
-        If a coordinate was already in self.path, it means that the algorithm is
-        backtracking. In that case, remove that coordinate form self.path.
-        Otherweise, it's a new node. Add to self.path."""
+    def play(self):
+        """Plays events() on self.maze, animated if self.animate is True, then
+        brings the drawing up to date."""
 
-        current = (self.currentX, self.currentY)
-        if current in self.path:
-            self.path.pop()
+        self.maze.play(self.events(), self.animate, self.STEPS_PER_FRAME, self.WEIGHTS)
+        if not self.animate:
+            self.maze.render()
         else:
-            self.path.append(current)
+            self.maze.flush()
 
-        self.changeNodeColor(self.maze.grid[self.currentY][self.currentX], self.VISITED_COLOR, 0)
+    def changeCellColor(self, index, state):
+        """Changes the state (and so the color) of the cell at grid index [index].
+        Returns the change as an (index, state) pair, to be yielded as an event.
+        -state: CellState. The cell's new state."""
 
-    def canMoveRight(self):
-        """Checks if there is a path to the right."""
+        self.maze.grid.states[index] = state
+        return index, state
 
-        if self.maze.grid[self.currentY][self.currentX + 1].isWall:
-            return False
-        return True
-
-    def moveRight(self):
-        """"Calls self.move and increments self.currentX"""
+"""*******************************END SOLVER BASE*********************************"""
 
-        self.move()
-        self.currentX += 1
 
-    def canMoveDown(self):
-        """Checks if there is a path downwards."""
+"""*****************************HUGH RIGHT-WALL-METHOD****************************"""
+class HugRightWall(Solver):
+    """Algorithm that traverses a maze by keeping one hand on the wall. With the
+    right hand, move higherchy goes as right_turn > moving_forward > left_turn >
+    moving_backwards; with the left hand, left and right turns swap places.
+    Moves are looked up in ORDERS rather than decided case by case, and the path
+    walked so far is indexed by cell, so every step takes O(1) time. When the
+    walk comes back to a cell already on the path, everything walked since is
+    dropped, which leaves the loop-free path from the entrance to the exit.
+    -PATH_STATE: CellState. Used for path from the entrance to the exit.
+    -VISITED_STATE: CellState. Used for visited nodes that are not in
+        direct path from the entrance to the exit.
+    -CURRENT_STATE: CellState. Used to show the algorithm's current position.
+    -HAND: string. Hand kept on the wall when none is given, "right" or "left".
+    -MOVES: tuple. (x, y) steps of the four directions, clockwise starting from
+        right. Directions are referred to by their position in MOVES.
+    -ORDERS: dictionary. For every hand, the directions to try when moving in
+        each direction, from the most preferred to the least.
+    -WEIGHTS: dictionary. How much a change to each state counts as an
+        animation step; see Maze.play()."""
+
+    PATH_STATE = CellState.SOLUTION
+    VISITED_STATE = CellState.VISITED
+    CURRENT_STATE = CellState.CURRENT
+
+    HAND = "right"
+
+    MOVES = ((1, 0), (0, 1), (-1, 0), (0, -1))          #Right, down, left, up
+    ORDERS = {
+        "right": tuple(tuple((heading + turn) % 4 for turn in (1, 0, 3, 2)) for heading in range(4)),
+        "left": tuple(tuple((heading + turn) % 4 for turn in (3, 0, 1, 2)) for heading in range(4)),
+    }
+
+    WEIGHTS = {CellState.VISITED: 0, CellState.SOLUTION: .5}
+
+    def __init__(self, maze, animate, hand=None, run=True):
+        """
+        -maze: Maze object. Maze to be traversed. Stored in self.maze.
+        -animate: Boolean. Determines whether pathfinding process will be shown.
+            stored in self.animate.
+        -hand: string or None. "right" or "left", the hand kept on the wall.
+            None uses HAND. Stored in self.hand.
+        -run: Boolean. If False, nothing is done until events() is consumed.
+        self.currentX: int. Represents algorithm's current column in the maze.
+        self.currentY: int. Represents algorithm's current row in the maze.
+        self.path: array. Coordinates (as tuples) of the path from the entrance
+            to the exit, without loops. Empty if the exit cannot be reached.
+        self.steps: int. Number of moves made to reach the exit."""
 
-        if self.maze.grid[self.currentY + 1][self.currentX].isWall:
-            return False
-        return True
+        hand = hand or self.HAND
+        if hand not in self.ORDERS:
+            raise ValueError("Unknown hand: " + str(hand))
 
-    def moveDown(self):
-        """"Calls self.move and increments self.currentY"""
+        self.maze = maze
+        self.animate = animate
+        self.hand = hand
 
-        self.move()
-        self.currentY += 1
+        self.currentX = maze.entrance.x
+        self.currentY = maze.entrance.y
+        self.path = []
+        self.steps = 0
+
+        if run:
+            self.play()
+
+    def events(self):
+        """Continues maze wandering until the exit has been found, and then
+        shows the path. Yields an (index, state) pair for every change; see
+        Maze.play()."""
+
+        yield from self.walk(True)
+        yield from self.createPath()
+
+    @classmethod
+    def follow(cls, maze, hand=None):
+        """Walks [maze] from the entrance to the exit with [hand] ("right" or
+        "left"; None uses HAND, so HugLeftWall walks left-handed) on the wall,
+        without drawing or changing anything on the maze, which makes this a
+        cheap way to solve large mazes.
+        Returns the number of moves made and the loop-free path from the
+        entrance to the exit, as a list of (x, y) tuples. The path is empty if
+        the walk cannot reach the exit."""
+
+        walker = cls(maze, False, hand, run=False)
+        for event in walker.walk(False):
+            pass
+        return walker.steps, walker.path
+
+    def walk(self, show):
+        """Walks from the entrance to the exit, storing the number of moves and
+        the loop-free path in self.steps and self.path.
+        -show: Boolean. If True, the current position and every visited cell
+            are shown, yielding an (index, state) pair for every change.
+            Otherwise nothing is yielded and the maze is not touched."""
+
+        maze = self.maze
+        cols = maze.cols
+        walls = maze.grid.walls
+        offsets = tuple(moveY * cols + moveX for moveX, moveY in self.MOVES)
+        orders = self.ORDERS[self.hand]
+        goal = maze.exit.index
+
+        current = maze.entrance.index
+        heading = 0                                 #Starts out moving right
+        path = []
+        position = {}                               #Cell index -> its position in path
+        steps = 0
+        limit = 4 * len(walls)                      #Every (cell, heading) pair at most once
+
+        while current != goal:
+            if steps == limit:
+                path = None                         #Walking in circles around an island
+                break
 
-    def canMoveLeft(self):
-        """Checks if there is a path to the left."""
+            if show:
+                yield self.changeCellColor(current, self.CURRENT_STATE)
 
-        if self.maze.grid[self.currentY][self.currentX - 1].isWall:
-            return False
-        return True
+            for heading in orders[heading]:
+                if not walls[current + offsets[heading]]:
+                    break
+            else:
+                path = None                         #Walled in
+                break
 
-    def moveLeft(self):
-        """"Calls self.move and decrements self.currentX"""
+            steps += 1
+            at = position.get(current)
+            if at is None:
+                position[current] = len(path)
+                path.append(current)
+            else:                                   #Back on the path, drop the loop walked since
+                for index in path[at + 1:]:
+                    del position[index]
+                del path[at + 1:]
+
+            if show:
+                yield self.changeCellColor(current, self.VISITED_STATE)
+            current += offsets[heading]
+
+        self.steps = steps
+        self.currentX = current % cols
+        self.currentY = current // cols
+        if path is None:
+            self.path = []
+        else:
+            path.append(goal)
+            self.path = [(index % cols, index // cols) for index in path]
 
-        self.move()
-        self.currentX -= 1
+    def createPath(self):
+        """Renders the path from the entrance to the exit. Changes the color
+        of all the nodes in self.path to PATH_STATE."""
 
-    def canMoveUp(self):
-        """Checks if there is a path upwards."""
+        for x, y in self.path:
+            yield self.changeCellColor(y * self.maze.cols + x, self.PATH_STATE)
 
-        if self.maze.grid[self.currentY - 1][self.currentX].isWall:
-            return False
-        return True
 
-    def moveUp(self):
-        """"Calls self.move and decrements self.currentY"""
-
-        self.move()
-        self.currentY -= 1
-
-    def nextMove(self, move):
-        """Finds the next possible move.
-        -move: one of the above move functions. Represents the current direction
-        in which the algorithm is moving.
-
-        Depending on which direction the algorithm is currently moving, this
-        function will return a move direction that prioritizes making right turns."""
-
-        if move == self.moveDown:       #Algorithm is currently moving downwards
-            if self.canMoveLeft():
-                return self.moveLeft
-            elif self.canMoveDown():
-                return move
-            elif self.canMoveRight():
-                return self.moveRight
-            return self.moveUp
-
-        elif move == self.moveLeft:     #Algorithm is currently moving left
-            if self.canMoveUp():
-                return self.moveUp
-            elif self.canMoveLeft():
-                return move
-            elif self.canMoveDown():
-                return self.moveDown
-            return self.moveRight
-
-        elif move == self.moveUp:       #Algorithm is currently moving upwards
-            if self.canMoveRight():
-                return self.moveRight
-            elif self.canMoveUp():
-                return move
-            elif self.canMoveLeft():
-                return self.moveLeft
-            return self.moveDown
-
-        else:                           #Algorithm is currently moving right
-            if self.canMoveDown():
-                return self.moveDown
-            elif self.canMoveRight():
-                return move
-            elif self.canMoveUp():
-                return self.moveUp
-            return self.moveLeft
+class HugLeftWall(HugRightWall):
+    """Extends HugRightWall. Keeps the left hand on the wall instead, so left
+    turns are preferred over anything else."""
 
-    def createPath(self):
-        """Renders the path from the entrance to the exit. Changes the color
-        of all the nodes in self.path to PATH_COLOR."""
-
-        for coord in self.path:
-            self.changeNodeColor(self.maze.grid[coord[1]][coord[0]], self.PATH_COLOR, .5)
-        self.changeNodeColor(self.maze.exit, self.PATH_COLOR, 0)
-
-    def changeNodeColor(self, node, color, multiplier=1.0):
-        """Changes the color of a node, and immediately renders it if animation
-        is enabled (self.animate = True)
-        -node: a Node object. The node whose color will be changed.
-        -color: a pygame Color object. node's new color.
-        -multiplier: double. Used to change WAIT_TIME in case a different effect
-        is needed for different parts."""
-
-        node.color = color
-        if self.animate:
-            node.render(self.maze.surface)
-            if multiplier != 0:
-                time.wait( int(self.WAIT_TIME * multiplier) )
-        else:
-            node.draw(self.maze.surface)
+    HAND = "left"
 
 """*****************************END OF HUGH-RIGHT-WALL****************************"""
 
 
 """*******************************A* SEARCH METHOD********************************"""
-class A_Star:
+class A_Star(Solver):
     """A* pathfinding algorithm. Finds the shortest path to the exit by computing
     the cost of traversing through nodes and then taking the path of least expense.
-    -PATH_COLOR: pygame Color object. Used for path from the entrance to the exit.
-    -TO_VISIT_COLOR: pygame Color object. Used to show which nodes are in line to
+    Nodes waiting to be evaluated are kept in a binary heap, and evaluated nodes
+    in a set, so a solve takes O(n log n) time on the number of explored nodes.
+    -PATH_STATE: CellState. Used for path from the entrance to the exit.
+    -TO_VISIT_STATE: CellState. Used to show which nodes are in line to
         be evaluated. The one with the lowest cost is evaluated next.
-    -VISITED_COLOR: pygame Color object. Used for visited nodes that are not in
+    -VISITED_STATE: CellState. Used for visited nodes that are not in
         direct path from the entrance to the exit.
-    -WAIT_TIME: int. The time (in ms) in between generation steps. Used to animate
-    maze traversal."""
+    -TIE_BREAKING: tuple of strings. Supported policies used to pick between
+        nodes with the same f value.
+        "lowH": prefer the node closest to the exit (default).
+        "fifo": prefer the node that was queued first.
+        "lifo": prefer the node that was queued last.
+    -BUFFERS: WeakKeyDictionary. SearchBuffers of every maze solved with
+        useArrays=True, so repeated solves on the same maze reuse them. A solve
+        takes them out while it runs, so solves running side by side on the
+        same maze never share buffers. Entries go away with their maze."""
 
-    PATH_COLOR = Color(0, 0, 200)
-    TO_VISIT_COLOR = Color(255, 140, 0)
-    VISITED_COLOR = Color(0, 200, 150)
+    PATH_STATE = CellState.SOLUTION
+    TO_VISIT_STATE = CellState.TO_VISIT
+    VISITED_STATE = CellState.VISITED
 
-    WAIT_TIME = 20
+    TIE_BREAKING = ("lowH", "fifo", "lifo")
 
-    class A_Node(Node):
-        """Extends Node. Designed to meet A* pathfinding's need.
-        -exit: Node object. Exit of the maze. Used by A_Nodes as reference to
-            calculate h value."""
+    BUFFERS = WeakKeyDictionary()
 
-        exit = None
+    class A_Node(Node):
+        """Extends Node. Designed to meet A* pathfinding's need. A_Nodes are only
+        created for cells the search reaches, and are kept by the A_Star object
+        rather than the maze."""
 
         #g -> distance from the start, h -> distance from the end, f -> g + h
-        def __init__(self, current, parent=None):
+        def __init__(self, grid, x, y, exit):
             """
-            -current: Node object. Node from Maze to be replaced.
-            -parent: Node object. Node which minimizes f value."""
-
-            if parent is None:
-                self.g = 0
-            else:
-                self.g = parent.g + 1
-            self.parent = parent
-            Node.__init__(self, current.x, current.y, current.color)
-            self.isWall = current.isWall
-
-        @property
-        def h(self):
-            """h -> distance from node to the end."""
-            return abs(self.exit.x - self.x) + abs(self.exit.y - self.y)
-
-        @property
-        def f(self):
-            """f -> g + h."""
-            return self.g + self.h
+            -grid: Grid object. Grid the node belongs to.
+            -x: int. Column of the node.
+            -y: int. Row of the node.
+            -exit: Node object. Exit of the maze. Used as reference to
+                calculate h value.
+            -self.h: int. Distance from node to the end. Computed once, since
+                the exit does not move during a search.
+            -self.f: int. g + h. Kept up to date by update()."""
+
+            Node.__init__(self, grid, x, y)
+            self.g = 0
+            self.parent = None
+            self.h = abs(exit.x - x) + abs(exit.y - y)
+            self.f = self.h
 
         def update(self, parent):
-            """Updates g value and parent."""
+            """Updates g value, f value and parent."""
             self.g = parent.g + 1
+            self.f = self.g + self.h
             self.parent = parent
 
-
-    def __init__(self, maze, animate):
-        """Initialization converts all nodes into A_Nodes, which contain special
-        characteristics for this pathfinding algorithm
+    class SearchBuffers:
+        """Flat arrays holding A* search state for every cell of a maze, indexed
+        by y * cols + x. Allocated once per maze and reused by every solve.
+        Instead of clearing the arrays before each solve, every solve gets a new
+        token; g and parent values of a cell only count if its seen stamp holds
+        the current token, and a cell is only evaluated if its closed stamp does.
+        -self.g: array of ints. Distance from the entrance.
+        -self.parent: array of ints. Index of the cell the search came from.
+        -self.seen: array of ints. Token of the last solve that reached the cell.
+        -self.closed: array of ints. Token of the last solve that evaluated the cell.
+        -self.token: int. Token of the current solve."""
+
+        def __init__(self, size):
+            """
+            -size: int. Number of cells in the maze."""
+
+            self.g = array("i", [0]) * size
+            self.parent = array("i", [-1]) * size
+            self.seen = array("I", [0]) * size
+            self.closed = array("I", [0]) * size
+            self.token = 0
+
+        def nextToken(self):
+            """Starts a new solve and returns its token. Only when the token
+            would overflow are the stamps actually cleared."""
+
+            if self.token == 0xFFFFFFFF:
+                size = len(self.seen)
+                self.seen = array("I", [0]) * size
+                self.closed = array("I", [0]) * size
+                self.token = 0
+            self.token += 1
+            return self.token
+
+
+    def __init__(self, maze, animate, tieBreaking="lowH", useArrays=False, run=True):
+        """A_Nodes are created when the search first reaches their cell. The maze
+        itself is not modified, apart from the states used to draw the search.
         -maze: Maze object. Stored in self.maze
         -animate: Boolean. Determines whether pathfinding process will be shown.
             stored in self.animate.
+        -tieBreaking: string. One of TIE_BREAKING. Stored in self.tieBreaking.
+        -useArrays: Boolean. If True, no A_Nodes are created. Search state is kept
+            in the maze's SearchBuffers instead (see generateWithArrays).
+            Stored in self.useArrays.
+        -run: Boolean. If False, nothing is done until events() is consumed.
+        -self.nodes: dictionary. A_Nodes created so far, keyed by grid index.
+        -self.path: array. Coordinates (as tuples) of the path from the entrance
+            to the exit. Empty if the exit cannot be reached.
+        -self.expanded: int. Number of nodes evaluated by the search.
+        -self.pushed: int. Number of entries put on the heap, counting nodes
+            queued again when their cost improves.
+        -self.reopened: int. Number of nodes queued again with a lower cost.
+        -self.checked: int. Number of open neighbors looked at.
         """
 
+        if tieBreaking not in self.TIE_BREAKING:
+            raise ValueError("Unknown tie breaking policy: " + str(tieBreaking))
+
         self.maze = maze
         self.animate = animate
+        self.tieBreaking = tieBreaking
+        self.useArrays = useArrays
+        self.path = []
+        self.expanded = 0
+        self.pushed = 0
+        self.reopened = 0
+        self.checked = 0
 
-        for row in range(maze.rows):
-            for col in range(maze.cols):
-                maze.grid[row][col] = self.A_Node(maze.grid[row][col])
-        self.A_Node.exit = maze.grid[maze.exit.y][maze.exit.x]
-        maze.entrance = maze.grid[maze.entrance.y][maze.entrance.x]
-        maze.exit = maze.grid[maze.exit.y][maze.exit.x]
+        self.nodes = {}
+        if run:
+            self.play()
 
-        self.generate()
+    def events(self):
+        """Searches for the path and shows it. Yields an (index, state) pair
+        for every change; see Maze.play()."""
 
-        if not animate:
-            maze.render()
+        if self.useArrays:
+            yield from self.generateWithArrays()
+        else:
+            self.exit = self.getNode(self.maze.exit.x, self.maze.exit.y)
+            self.entrance = self.getNode(self.maze.entrance.x, self.maze.entrance.y)
+            yield from self.generate()
+
+    def getNode(self, x, y):
+        """Gets the A_Node of cell (x, y), creating it on first use."""
+
+        index = y * self.maze.cols + x
+        node = self.nodes.get(index)
+        if node is None:
+            node = self.A_Node(self.maze.grid, x, y, self.maze.exit)
+            self.nodes[index] = node
+        return node
+
+    def priority(self, f, h, order, item):
+        """Heap key of [item] under self.tieBreaking. Lower keys are evaluated first.
+        -f: int. f value of the item.
+        -h: int. h value of the item.
+        -order: int. Increases every time an item is queued. Also keeps keys unique,
+            so items themselves are never compared.
+        -item: A_Node object or grid index. Item to be queued."""
+
+        if self.tieBreaking == "lowH":
+            return (f, h, order, item)
+        elif self.tieBreaking == "lifo":
+            return (f, -order, item)
+        return (f, order, item)
 
     def generate(self):
         """Main logic of pathfinding algorithm. Evaluates nodes starting from
-        the one with the lowest f value from self.toVisit. It then removes that
-        node from self.toVisit and puts it in self.visited. If that node is not
-        the exit, it then proceeds to queue all neighboring nodes for evaluation
-        in the case they haven't been evaluated yet."""
-
-        toVisit = [self.maze.entrance]
-        visited = []
-
-        while True:
-            current = min(toVisit, key=lambda node: node.f)
-            toVisit.remove(current)
-            visited.append(current)
-            self.changeNodeColor(current, self.VISITED_COLOR)
-
-            if current is self.A_Node.exit:
-                break
-
-            for neighbor in self.getNeighbors(current):
-
-                if neighbor in visited:
-                    continue
-
-                if neighbor.parent is None or neighbor.f > current.f + 1:
-
-                    neighbor.update(current)
-
-                    if neighbor not in toVisit:
-                        toVisit.append(neighbor)
-                        self.changeNodeColor(neighbor, self.TO_VISIT_COLOR)
-
-        self.displayPath()
+        the one with the lowest f value from toVisit, a binary heap. Nodes whose
+        cost improves are queued again rather than updated in place; the outdated
+        entries are skipped once they reach the top of the heap (lazy deletion).
+        Evaluated nodes are put in visited. If that node is not the exit, it then
+        proceeds to queue all neighboring nodes for evaluation in the case they
+        haven't been evaluated yet."""
+
+        order = 0
+        expanded = checked = reopened = 0
+        toVisit = [self.priority(self.entrance.f, self.entrance.h, order, self.entrance)]
+        visited = set()
+
+        try:
+            while toVisit:
+                current = heappop(toVisit)[-1]
+                if current in visited:
+                    continue                #Outdated entry, node was already evaluated
+                visited.add(current)
+                expanded += 1
+                yield self.changeNodeColor(current, self.VISITED_STATE)
+
+                if current is self.exit:
+                    yield from self.displayPath()
+                    return
+
+                for neighbor in self.getNeighbors(current):
+
+                    checked += 1
+                    if neighbor in visited:
+                        continue
+
+                    if neighbor.parent is None or current.g + 1 < neighbor.g:
+
+                        firstVisit = neighbor.parent is None
+                        neighbor.update(current)
+
+                        order += 1
+                        heappush(toVisit, self.priority(neighbor.f, neighbor.h, order, neighbor))
+                        if firstVisit:
+                            yield self.changeNodeColor(neighbor, self.TO_VISIT_STATE)
+                        else:
+                            reopened += 1
+        finally:
+            self.count(expanded, order + 1, reopened, checked)
+
+    def generateWithArrays(self):
+        """Same search as generate(), but without A_Nodes. g values and parents
+        live in the maze's SearchBuffers and the heap holds grid indices, so
+        setting up a solve costs O(1) instead of creating an object per cell,
+        and nothing is left behind on the maze for the next solve."""
+
+        maze = self.maze
+        size = maze.rows * maze.cols
+
+        buffers = self.BUFFERS.pop(maze, None)          #Taken for as long as this solve runs
+        if buffers is None or len(buffers.g) != size:
+            buffers = self.SearchBuffers(size)
+        try:
+            yield from self.searchArrays(buffers)
+        finally:
+            self.BUFFERS[maze] = buffers
+
+    def searchArrays(self, buffers):
+        """Search of generateWithArrays(), with the state kept in [buffers], a
+        SearchBuffers object no other solve is using."""
+
+        maze = self.maze
+        cols = maze.cols
+        walls = maze.grid.walls
+        neighbors = maze.grid.neighbors
+
+        token = buffers.nextToken()
+        g = buffers.g
+        parent = buffers.parent
+        seen = buffers.seen
+        closed = buffers.closed
+
+        exitX = maze.exit.x
+        exitY = maze.exit.y
+        start = maze.entrance.index
+        goal = maze.exit.index
+
+        g[start] = 0
+        parent[start] = -1
+        seen[start] = token
+        h = abs(exitX - maze.entrance.x) + abs(exitY - maze.entrance.y)
+
+        order = 0
+        expanded = checked = reopened = 0
+        toVisit = [self.priority(h, h, order, start)]
+
+        try:
+            while toVisit:
+                current = heappop(toVisit)[-1]
+                if closed[current] == token:
+                    continue                #Outdated entry, cell was already evaluated
+                closed[current] = token
+                expanded += 1
+                yield self.changeCellColor(current, self.VISITED_STATE)
+
+                if current == goal:
+                    yield from self.displayPathFromArrays(parent, goal)
+                    return
+
+                neighborG = g[current] + 1
+
+                for neighbor in neighbors(current):
+
+                    if neighbor < 0 or walls[neighbor]:
+                        continue
+                    checked += 1
+                    if closed[neighbor] == token:
+                        continue
+
+                    firstVisit = seen[neighbor] != token
+                    if firstVisit or neighborG < g[neighbor]:
+
+                        seen[neighbor] = token
+                        g[neighbor] = neighborG
+                        parent[neighbor] = current
+
+                        neighborY, neighborX = divmod(neighbor, cols)
+                        h = abs(exitX - neighborX) + abs(exitY - neighborY)
+                        order += 1
+                        heappush(toVisit, self.priority(neighborG + h, h, order, neighbor))
+                        if firstVisit:
+                            yield self.changeCellColor(neighbor, self.TO_VISIT_STATE)
+                        else:
+                            reopened += 1
+        finally:
+            self.count(expanded, order + 1, reopened, checked)
+
+    def count(self, expanded, pushed, reopened, checked):
+        """Adds the counters of a search to self.expanded, self.pushed,
+        self.reopened and self.checked. Searches count in local variables,
+        which are cheaper to update than attributes, and call this once they
+        end, even if they are not run to the end."""
+
+        self.expanded += expanded
+        self.pushed += pushed
+        self.reopened += reopened
+        self.checked += checked
 
     def getNeighbors(self, node):
         """Gets all the neighbors of node"""
@@ -313,66 +538,1098 @@ class A_Star:
         neighbors = []
 
         if self.canMoveRight(node):
-            neighbors.append(self.maze.grid[node.y][node.x + 1])
+            neighbors.append(self.getNode(node.x + 1, node.y))
         if self.canMoveDown(node):
-            neighbors.append(self.maze.grid[node.y + 1][node.x])
+            neighbors.append(self.getNode(node.x, node.y + 1))
         if self.canMoveLeft(node):
-            neighbors.append(self.maze.grid[node.y][node.x - 1])
+            neighbors.append(self.getNode(node.x - 1, node.y))
         if self.canMoveUp(node):
-            neighbors.append(self.maze.grid[node.y - 1][node.x])
+            neighbors.append(self.getNode(node.x, node.y - 1))
 
         return neighbors
 
     def canMoveRight(self, node):
         """Checks if the right neighbor of node is not a wall and is not out of bounds"""
 
-        if node.x == self.maze.cols - 1 or self.maze.grid[node.y][node.x + 1].isWall:
+        if node.x == self.maze.cols - 1 or self.maze.grid.walls[node.index + 1]:
             return False
         return True
 
     def canMoveDown(self, node):
         """Checks if the top neighbor of node is not a wall"""
 
-        if self.maze.grid[node.y + 1][node.x].isWall:
+        if self.maze.grid.walls[node.index + self.maze.cols]:
             return False
         return True
 
     def canMoveLeft(self, node):
         """Checks if the left neighbor of node is not a wall and is not out of bounds"""
 
-        if node.x == 0 or self.maze.grid[node.y][node.x - 1].isWall:
+        if node.x == 0 or self.maze.grid.walls[node.index - 1]:
             return False
         return True
 
     def canMoveUp(self, node):
         """Checks if the top neighbor of node is not a wall"""
 
-        if self.maze.grid[node.y - 1][node.x].isWall:
+        if self.maze.grid.walls[node.index - self.maze.cols]:
             return False
         return True
 
     def displayPath(self):
         """Render path from the entrance to the exit. Rendering starts from the exit."""
 
-        current = self.A_Node.exit
+        current = self.exit
         while current is not None:
-            self.changeNodeColor(current, self.PATH_COLOR, .5)
+            self.path.append((current.x, current.y))
+            yield self.changeNodeColor(current, self.PATH_STATE)
             current = current.parent
+        self.path.reverse()
 
-    def changeNodeColor(self, node, color, multiplier=1):
-        """Changes the color of a node, and immediately renders it if animation
-        is enabled (self.animate = True)
-        -node: a Node object. The node whose color will be changed.
-        -color: a pygame Color object. node's new color.
-        -multiplier: double. Used to change WAIT_TIME in case a different effect
-        is needed for different parts."""
-
-        node.color = color
-        if self.animate:
-            node.render(self.maze.surface)
-            if multiplier != 0:
-                time.wait(int(self.WAIT_TIME * multiplier))
-        else:
-            node.draw(self.maze.surface)
+    def displayPathFromArrays(self, parent, goal):
+        """Same as displayPath(), following the parent array of generateWithArrays().
+        -parent: array of ints. Parent index of every reached cell.
+        -goal: int. Index of the exit."""
+
+        cols = self.maze.cols
+        current = goal
+        while current != -1:
+            self.path.append((current % cols, current // cols))
+            yield self.changeCellColor(current, self.PATH_STATE)
+            current = parent[current]
+        self.path.reverse()
+
+    def changeNodeColor(self, node, state):
+        """Changes the state (and so the color) of a node. Returns the change as
+        an (index, state) pair, to be yielded as an event.
+        -node: a Node object. The node whose state will be changed.
+        -state: CellState. node's new state."""
+
+        return self.changeCellColor(node.index, state)
 
 """***************************END A* PATHFINDING******************************"""
+
+
+"""****************************BREADTH-FIRST SEARCH*******************************"""
+class BreadthFirst(Solver):
+    """Breadth-first search. Explores the maze in layers of cells at the same
+    distance from the entrance, so the exit is first reached through a shortest
+    path. Every step in a maze costs the same, so unlike A_Star no heuristic or
+    heap is needed: cells waiting to be evaluated are kept in a deque, in the
+    order they were reached. Reached cells are tracked in a single bytearray
+    holding the move that reached them, which is also enough to walk the path
+    back, so a solve takes O(n) time and one byte per cell.
+    -PATH_STATE: CellState. Used for path from the entrance to the exit.
+    -TO_VISIT_STATE: CellState. Used to show which cells are in line to
+        be evaluated.
+    -VISITED_STATE: CellState. Used for evaluated cells that are not in
+        direct path from the entrance to the exit.
+    -ROOT: int. Move stored for the cell a search starts from. Moves 1 to 4
+        are right, down, left and up; 0 means the cell was not reached."""
+
+    PATH_STATE = CellState.SOLUTION
+    TO_VISIT_STATE = CellState.TO_VISIT
+    VISITED_STATE = CellState.VISITED
+
+    ROOT = 5
+
+    def __init__(self, maze, animate, run=True):
+        """The maze itself is not modified, apart from the states used to draw
+        the search.
+        -maze: Maze object. Stored in self.maze
+        -animate: Boolean. Determines whether pathfinding process will be shown.
+            stored in self.animate.
+        -run: Boolean. If False, nothing is done until events() is consumed.
+        -self.path: array. Coordinates (as tuples) of the path from the entrance
+            to the exit. Empty if the exit cannot be reached.
+        -self.expanded: int. Number of cells evaluated by the search."""
+
+        self.maze = maze
+        self.animate = animate
+        self.path = []
+        self.expanded = 0
+
+        if run:
+            self.play()
+
+    def events(self):
+        """Searches for the path and shows it. Yields an (index, state) pair
+        for every change; see Maze.play()."""
+
+        return self.generate()
+
+    def generate(self):
+        """Main logic of pathfinding algorithm. Evaluates cells in the order they
+        were reached, queueing every open neighbor that was not reached yet. The
+        search stops as soon as the exit is reached."""
+
+        maze = self.maze
+        start = maze.entrance.index
+        goal = maze.exit.index
+
+        reachedBy = bytearray(len(maze.grid.walls))
+        reachedBy[start] = self.ROOT
+        if start == goal:
+            yield from self.displayPath(reachedBy, goal)
+            return
+
+        toVisit = deque([start])
+        while toVisit:
+            if (yield from self.expandLayer(toVisit, reachedBy)) == goal:
+                yield from self.displayPath(reachedBy, goal)
+                return
+
+    def expandLayer(self, toVisit, reachedBy, target=None):
+        """Evaluates the next layer of a search, that is, every cell currently in
+        [toVisit], queueing the cells they reach. Stops early once a cell is
+        reached that is the exit, or that [target] marks. Returns the index of
+        that cell, or -1.
+        -toVisit: deque of ints. Grid indices of the cells in line to be evaluated.
+        -reachedBy: bytearray. Move that reached every cell of the search.
+        -target: bytearray or None. Cells to stop at, besides the exit."""
+
+        maze = self.maze
+        walls = maze.grid.walls
+        neighbors = maze.grid.neighbors
+        goal = maze.exit.index
+        popleft = toVisit.popleft
+        append = toVisit.append
+
+        expanded = 0
+        try:
+            for expanded in range(1, len(toVisit) + 1):    #Counts the cells evaluated so far
+                current = popleft()
+                yield self.changeCellColor(current, self.VISITED_STATE)
+
+                for move, neighbor in enumerate(neighbors(current), 1):
+
+                    if neighbor < 0 or walls[neighbor] or reachedBy[neighbor]:
+                        continue
+
+                    reachedBy[neighbor] = move
+                    if neighbor == goal or (target is not None and target[neighbor]):
+                        return neighbor
+                    append(neighbor)
+                    yield self.changeCellColor(neighbor, self.TO_VISIT_STATE)
+        finally:
+            self.expanded += expanded
+
+        return -1
+
+    def walkBack(self, reachedBy, index):
+        """Grid indices of the cells from [index] back to the cell the search
+        started from, following the moves stored in [reachedBy]."""
+
+        cols = self.maze.cols
+        offsets = (0, 1, cols, -1, -cols)
+
+        cells = [index]
+        move = reachedBy[index]
+        while move != self.ROOT:
+            index -= offsets[move]
+            cells.append(index)
+            move = reachedBy[index]
+        return cells
+
+    def displayPath(self, reachedBy, goal):
+        """Render path from the entrance to the exit. Rendering starts from the exit.
+        -reachedBy: bytearray. Moves of a search started at the entrance.
+        -goal: int. Index of the exit."""
+
+        yield from self.showPath(self.walkBack(reachedBy, goal)[::-1])
+
+    def showPath(self, cells):
+        """Stores [cells], the grid indices of the path from the entrance to the
+        exit, in self.path and renders them starting from the exit."""
+
+        cols = self.maze.cols
+        self.path = [(index % cols, index // cols) for index in cells]
+        for index in reversed(cells):
+            yield self.changeCellColor(index, self.PATH_STATE)
+
+
+class BidirectionalBFS(BreadthFirst):
+    """Extends BreadthFirst. Runs two breadth-first searches at once, one from
+    the entrance and one from the exit, and stops where they meet. Each round
+    evaluates a whole layer of the search with the fewer cells in line, so both
+    searches stay about the same size. Each search only has to cover about half
+    the distance, which saves work where the number of cells at a given
+    distance grows quickly, as in braided or open mazes. In perfect mazes,
+    which branch little, both searches together evaluate about as many cells
+    as a single one, often a few more.
+    Because whole layers are evaluated at a time, the first cell reached by both
+    searches lies on a shortest path."""
+
+    def generate(self):
+        """Main logic of pathfinding algorithm. Grows the smaller of the two
+        searches by one layer until one of them reaches a cell the other one
+        already reached."""
+
+        maze = self.maze
+        start = maze.entrance.index
+        goal = maze.exit.index
+        size = len(maze.grid.walls)
+
+        fromEntrance = bytearray(size)
+        fromExit = bytearray(size)
+        fromEntrance[start] = self.ROOT
+        fromExit[goal] = self.ROOT
+        if start == goal:
+            yield from self.displayPath(fromEntrance, goal)
+            return
+
+        entranceSide = deque([start])
+        exitSide = deque([goal])
+        while entranceSide and exitSide:
+            if len(entranceSide) <= len(exitSide):
+                meeting = yield from self.expandLayer(entranceSide, fromEntrance, fromExit)
+            else:
+                meeting = yield from self.expandLayer(exitSide, fromExit, fromEntrance)
+
+            if meeting != -1:
+                cells = self.walkBack(fromEntrance, meeting)[::-1]
+                cells.extend(self.walkBack(fromExit, meeting)[1:])
+                yield from self.showPath(cells)
+                return
+
+"""**************************END BREADTH-FIRST SEARCH*****************************"""
+
+
+"""*****************************JUMP POINT SEARCH*********************************"""
+class JumpPointSearch(A_Star):
+    """Extends A_Star. Jump Point Search for grids where moves are only made
+    up, down, left and right. A* spends most of its time queueing the cells of
+    straight corridors and open areas one by one, even though there is only
+    one sensible way through them. Jump Point Search instead scans ahead in a
+    straight line from every evaluated cell and only queues the cell where the
+    scan has to stop: a jump point, where a new way opens that could not have
+    been reached as quickly from the cell the scan came from. Every jump point
+    is a turn, so far fewer cells are queued and evaluated, and the path found
+    is still a shortest one.
+    Colors are the same as A_Star's; only jump points are shown as queued and
+    evaluated."""
+
+    def __init__(self, maze, animate, tieBreaking="lowH", run=True):
+        """The maze itself is not modified, apart from the states used to draw
+        the search.
+        -maze: Maze object. Stored in self.maze
+        -animate: Boolean. Determines whether pathfinding process will be shown.
+            stored in self.animate.
+        -tieBreaking: string. One of TIE_BREAKING. Stored in self.tieBreaking.
+        -run: Boolean. If False, nothing is done until events() is consumed.
+        -self.path: array. Coordinates (as tuples) of the path from the entrance
+            to the exit, with every cell in between. Empty if the exit cannot
+            be reached.
+        -self.expanded: int. Number of jump points evaluated by the search."""
+
+        if tieBreaking not in self.TIE_BREAKING:
+            raise ValueError("Unknown tie breaking policy: " + str(tieBreaking))
+
+        self.maze = maze
+        self.animate = animate
+        self.tieBreaking = tieBreaking
+        self.path = []
+        self.expanded = 0
+
+        if run:
+            self.play()
+
+    def events(self):
+        """Searches for the path and shows it. Yields an (index, state) pair
+        for every change; see Maze.play()."""
+
+        return self.generate()
+
+    def generate(self):
+        """Main logic of pathfinding algorithm. Same as A_Star's, except that
+        the cells queued from an evaluated cell are the jump points found by
+        scanning away from it, at a cost equal to the length of the scan. Only
+        the directions that are not pruned are scanned: the direction the cell
+        was reached in and the two sideways ones; all four from the entrance."""
+
+        maze = self.maze
+        cols = maze.cols
+        exitX = maze.exit.x
+        exitY = maze.exit.y
+        start = maze.entrance.index
+        goal = maze.exit.index
+
+        g = {start: 0}
+        parent = {start: -1}
+        closed = set()
+
+        h = abs(exitX - maze.entrance.x) + abs(exitY - maze.entrance.y)
+        order = 0
+        toVisit = [self.priority(h, h, order, start)]
+
+        try:
+            while toVisit:
+                current = heappop(toVisit)[-1]
+                if current in closed:
+                    continue                #Outdated entry, jump point was already evaluated
+                closed.add(current)
+                yield self.changeCellColor(current, self.VISITED_STATE)
+
+                if current == goal:
+                    yield from self.displayJumpPath(parent, goal)
+                    return
+
+                y, x = divmod(current, cols)
+                for moveX, moveY in self.directions(current, parent[current]):
+
+                    if moveX:
+                        jumpPoint = self.jumpHorizontal(x + moveX, y, moveX)
+                    else:
+                        jumpPoint = self.jumpVertical(x, y + moveY, moveY)
+                    if jumpPoint == -1 or jumpPoint in closed:
+                        continue
+
+                    jumpY, jumpX = divmod(jumpPoint, cols)
+                    jumpG = g[current] + abs(jumpX - x) + abs(jumpY - y)
+                    firstVisit = jumpPoint not in g
+                    if firstVisit or jumpG < g[jumpPoint]:
+
+                        g[jumpPoint] = jumpG
+                        parent[jumpPoint] = current
+
+                        h = abs(exitX - jumpX) + abs(exitY - jumpY)
+                        order += 1
+                        heappush(toVisit, self.priority(jumpG + h, h, order, jumpPoint))
+                        if firstVisit:
+                            yield self.changeCellColor(jumpPoint, self.TO_VISIT_STATE)
+        finally:
+            self.expanded += len(closed)             #Every jump point evaluated was closed
+
+    def directions(self, index, parentIndex):
+        """Directions, as (x, y) steps, worth scanning from the jump point at
+        [index] that was reached from [parentIndex] (-1 for the entrance)."""
+
+        if parentIndex == -1:
+            return ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+        cols = self.maze.cols
+        y, x = divmod(index, cols)
+        parentY, parentX = divmod(parentIndex, cols)
+        if x != parentX:
+            moveX = 1 if x > parentX else -1
+            return ((moveX, 0), (0, 1), (0, -1))
+        moveY = 1 if y > parentY else -1
+        return ((0, moveY), (1, 0), (-1, 0))
+
+    def jumpHorizontal(self, x, y, moveX):
+        """Scans from cell (x, y) in horizontal direction [moveX] (1 or -1).
+        Returns the index of the first jump point: the exit, or a cell with an
+        opening above or below it that the cell it was reached from does not
+        have. Returns -1 if a wall or the edge of the maze is hit first."""
+
+        maze = self.maze
+        cols = maze.cols
+        walls = maze.grid.walls
+        goal = maze.exit.index
+        hasAbove = y > 0
+        hasBelow = y < maze.rows - 1
+
+        index = y * cols + x
+        while 0 <= x < cols and not walls[index]:
+            if index == goal:
+                return index
+            #The cell the scan came from is always open, so only walls beside it count
+            if hasAbove and not walls[index - cols] and walls[index - cols - moveX]:
+                return index
+            if hasBelow and not walls[index + cols] and walls[index + cols - moveX]:
+                return index
+            x += moveX
+            index += moveX
+        return -1
+
+    def jumpVertical(self, x, y, moveY):
+        """Scans from cell (x, y) in vertical direction [moveY] (1 or -1).
+        Returns the index of the first jump point: the exit, a cell with an
+        opening to its left or right that the cell it was reached from does not
+        have, or a cell from which a horizontal scan finds a jump point.
+        Returns -1 if a wall or the edge of the maze is hit first."""
+
+        maze = self.maze
+        cols = maze.cols
+        rows = maze.rows
+        walls = maze.grid.walls
+        goal = maze.exit.index
+        hasLeft = x > 0
+        hasRight = x < cols - 1
+        back = moveY * cols
+
+        index = y * cols + x
+        while 0 <= y < rows and not walls[index]:
+            if index == goal:
+                return index
+            if hasLeft and not walls[index - 1]:
+                if walls[index - 1 - back] or self.jumpHorizontal(x - 1, y, -1) != -1:
+                    return index
+            if hasRight and not walls[index + 1]:
+                if walls[index + 1 - back] or self.jumpHorizontal(x + 1, y, 1) != -1:
+                    return index
+            y += moveY
+            index += back
+        return -1
+
+    def displayJumpPath(self, parent, goal):
+        """Render path from the entrance to the exit, filling in the cells
+        between consecutive jump points. Rendering starts from the exit.
+        -parent: dictionary. Jump point each jump point was reached from.
+        -goal: int. Index of the exit."""
+
+        cols = self.maze.cols
+        current = goal
+        while current != -1:
+            y, x = divmod(current, cols)
+            previous = parent[current]
+            if previous == -1:
+                self.path.append((x, y))
+                yield self.changeCellColor(current, self.PATH_STATE)
+                break
+
+            previousY, previousX = divmod(previous, cols)
+            stepX = (previousX > x) - (previousX < x)
+            stepY = (previousY > y) - (previousY < y)
+            while (x, y) != (previousX, previousY):
+                self.path.append((x, y))
+                yield self.changeCellColor(y * cols + x, self.PATH_STATE)
+                x += stepX
+                y += stepY
+            current = previous
+        self.path.reverse()
+
+"""***************************END JUMP POINT SEARCH*******************************"""
+
+
+"""**************************INCREMENTAL REPLANNING (LPA*)************************"""
+class LPA_Star(Solver):
+    """Lifelong Planning A*. Finds the shortest path from the entrance to the
+    exit like A_Star, but keeps its search after finishing, so that when walls
+    are opened or closed with Maze.setWall() only the part of the search that
+    the change affects is redone, instead of starting over.
+    Every reached cell has two distance estimates: g, the distance the search
+    settled on, and rhs, the best distance through its neighbors' g values.
+    A cell whose two estimates differ is inconsistent and is queued, in order
+    of the same cost A_Star uses. A wall edit only changes rhs of the edited
+    cell and its neighbors, so replanning starts from those cells and stops
+    as soon as the exit's estimates are consistent and nothing cheaper is queued.
+    -PATH_STATE: CellState. Used for path from the entrance to the exit.
+    -VISITED_STATE: CellState. Used for cells whose distance was settled
+        (or raised, after a wall closed) by the search."""
+
+    PATH_STATE = CellState.SOLUTION
+    VISITED_STATE = CellState.VISITED
+
+    def __init__(self, maze, animate, run=True):
+        """The maze itself is not modified, apart from the states used to draw
+        the search.
+        -maze: Maze object. Stored in self.maze
+        -animate: Boolean. Determines whether pathfinding process will be shown.
+            stored in self.animate.
+        -run: Boolean. If False, nothing is done until events() is consumed.
+        -self.path: array. Coordinates (as tuples) of the path from the entrance
+            to the exit. Empty if the exit cannot be reached.
+        -self.expanded: int. Number of cells evaluated by the last plan or replan.
+        -self.onPath: set. Grid indices of the cells of self.path.
+        -self.pathChanged: Boolean. Whether the last plan or replan evaluated a
+            cell of the path, which then has to be found again."""
+
+        self.maze = maze
+        self.animate = animate
+        self.path = []
+        self.expanded = 0
+        self.onPath = set()
+        self.pathChanged = False
+
+        self.initialize()
+
+        if run:
+            self.play()
+
+    def initialize(self):
+        """Forgets every search result. Only the entrance is queued.
+        -self.g: dictionary. g value of every cell that has one, by grid index.
+            Missing cells count as infinitely far.
+        -self.rhs: dictionary. rhs value of every cell that has one, same as g.
+        -self.toVisit: list. Binary heap of (cost, distance, index) entries.
+            Entries whose key no longer matches self.queued are outdated and
+            skipped when they reach the top (lazy deletion).
+        -self.queued: dictionary. Current key of every queued cell.
+        -self.edits: list. maze.edits this search follows.
+        -self.applied: int. Number of edits of self.edits already replanned for."""
+
+        maze = self.maze
+        self.start = maze.entrance.index
+        self.goal = maze.exit.index
+        self.g = {}
+        self.rhs = {self.start: 0}
+        self.toVisit = []
+        self.queued = {}
+        self.edits = maze.edits
+        self.applied = len(maze.edits)
+        self.queue(self.start)
+
+    def events(self):
+        """Searches for the path and shows it. Yields an (index, state) pair
+        for every change; see Maze.play()."""
+
+        self.expanded = 0
+        yield from self.computeShortestPath()
+        yield from self.displayPath()
+
+    def replan(self):
+        """Repairs the path after walls were changed with Maze.setWall(), only
+        redoing the part of the search the changes affect. The old path is
+        shown as visited and the new one is drawn in its place. If the maze was
+        reset, or its entrance or exit moved, the search starts over."""
+
+        maze = self.maze
+        if maze.edits is not self.edits or maze.entrance.index != self.start or maze.exit.index != self.goal:
+            self.initialize()
+
+        stepsPerFrame = self.STEPS_PER_FRAME if self.animate else float("inf")
+        maze.play(self.replanEvents(), True, stepsPerFrame, self.WEIGHTS)
+        maze.flush()
+
+    def replanEvents(self):
+        """Events of replan(). Yields an (index, state) pair for every change.
+        The path is only drawn again if the search changed."""
+
+        edits = self.edits[self.applied:]
+        self.applied = len(self.edits)
+        for index in edits:
+            self.updateCell(index)
+            for neighbor in self.maze.grid.neighbors(index):
+                self.updateCell(neighbor)
+
+        if len(self.toVisit) > 2 * len(self.queued) + 64:       #Mostly outdated entries
+            self.toVisit = [(key[0], key[1], index) for index, key in self.queued.items()]
+            heapify(self.toVisit)
+
+        self.expanded = 0
+        self.pathChanged = False
+        yield from self.computeShortestPath()
+        if self.path and not self.pathChanged:
+            return                      #Every cell of the path kept its distance
+
+        walls = self.maze.grid.walls
+        cols = self.maze.cols
+        for x, y in self.path:
+            index = y * cols + x
+            if not walls[index]:
+                yield self.changeCellColor(index, self.VISITED_STATE)
+        yield from self.displayPath()
+
+    def key(self, index):
+        """Queue key of the cell at [index]: (cost, distance), where distance
+        is the smaller of its g and rhs values and cost adds the Manhattan
+        distance to the exit. Lower keys are evaluated first."""
+
+        distance = min(self.g.get(index, INFINITY), self.rhs.get(index, INFINITY))
+        cols = self.maze.cols
+        h = abs(self.goal % cols - index % cols) + abs(self.goal // cols - index // cols)
+        return (distance + h, distance)
+
+    def queue(self, index):
+        """Queues the cell at [index] with its current key."""
+
+        key = self.key(index)
+        self.queued[index] = key
+        heappush(self.toVisit, (key[0], key[1], index))
+
+    def updateCell(self, index):
+        """Recomputes rhs of the cell at [index] from its neighbors, and queues
+        it if it became inconsistent or takes it out of the queue otherwise.
+        Walls cannot be stepped on, so their rhs is infinite."""
+
+        if index < 0:
+            return
+
+        rhs = self.rhs
+        if index != self.start:
+            best = INFINITY
+            walls = self.maze.grid.walls
+            if not walls[index]:
+                g = self.g
+                for neighbor in self.maze.grid.neighbors(index):
+                    if neighbor >= 0 and not walls[neighbor]:
+                        distance = g.get(neighbor, INFINITY) + 1
+                        if distance < best:
+                            best = distance
+            if best == INFINITY:
+                rhs.pop(index, None)
+            else:
+                rhs[index] = best
+
+        if self.g.get(index, INFINITY) != rhs.get(index, INFINITY):
+            self.queue(index)
+        else:
+            self.queued.pop(index, None)
+
+    def computeShortestPath(self):
+        """Main logic of pathfinding algorithm. Evaluates inconsistent cells in
+        order of their keys until the exit is consistent and no queued cell has
+        a lower key than it. A cell whose g was too high gets g = rhs, settling
+        its distance; a cell whose g was too low (a wall closed on its way) gets
+        an infinite g and is queued again. Either way its neighbors' rhs are
+        recomputed. Yields an (index, state) pair for every cell evaluated."""
+
+        g = self.g
+        rhs = self.rhs
+        toVisit = self.toVisit
+        queued = self.queued
+        goal = self.goal
+        expanded = 0
+
+        try:
+            while toVisit:
+                cost, distance, current = toVisit[0]
+                if queued.get(current) != (cost, distance):
+                    heappop(toVisit)
+                    continue                #Outdated entry
+                if (cost, distance) >= self.key(goal) and g.get(goal, INFINITY) == rhs.get(goal, INFINITY):
+                    break
+
+                heappop(toVisit)
+                del queued[current]
+                expanded += 1
+                if current in self.onPath:
+                    self.pathChanged = True
+
+                if g.get(current, INFINITY) > rhs.get(current, INFINITY):
+                    g[current] = rhs[current]
+                else:
+                    g.pop(current, None)
+                    self.updateCell(current)
+                yield self.changeCellColor(current, self.VISITED_STATE)
+
+                for neighbor in self.maze.grid.neighbors(current):
+                    self.updateCell(neighbor)
+        finally:
+            self.expanded += expanded
+
+    def displayPath(self):
+        """Render path from the entrance to the exit. Rendering starts from the
+        exit and walks back through the neighbor with the lowest g each time."""
+
+        cols = self.maze.cols
+        walls = self.maze.grid.walls
+        g = self.g
+        self.path = []
+        self.onPath = set()
+
+        current = self.goal
+        if g.get(current, INFINITY) == INFINITY:
+            return
+
+        cells = [current]
+        while current != self.start:
+            best = -1
+            distance = g[current]
+            for neighbor in self.maze.grid.neighbors(current):
+                if neighbor >= 0 and not walls[neighbor] and g.get(neighbor, INFINITY) < distance:
+                    best = neighbor
+                    distance = g[neighbor]
+            if best == -1:
+                return                  #Not reachable through settled cells
+            current = best
+            cells.append(current)
+
+        for index in cells:
+            yield self.changeCellColor(index, self.PATH_STATE)
+        cells.reverse()
+        self.path = [(index % cols, index // cols) for index in cells]
+        self.onPath = set(cells)
+
+"""**********************END INCREMENTAL REPLANNING (LPA*)************************"""
+
+
+"""******************************JUNCTION GRAPH***********************************"""
+class JunctionGraph:
+    """Compressed version of a maze for searching. Most open cells of a maze
+    are in corridors, with exactly two open neighbors, where a search can only
+    go on to the next cell. The graph keeps only the other open cells as
+    nodes: junctions, dead ends, the entrance and the exit. Every corridor
+    between two nodes becomes a single edge, weighted by its length and
+    holding the run of cells along it, so a search over the graph takes one
+    step per corridor instead of one per cell, and the corridors it used can
+    be expanded back into cells afterwards.
+    The maze is scanned once, on creation; where NumPy is installed, the open
+    neighbors of every cell are counted with it. The graph is not updated when
+    the maze changes.
+    -self.nodes: list of ints. Grid index of every node, by node id.
+    -self.ids: dictionary. Node id of every node, by grid index.
+    -self.edges: list of lists. For every node id, a (node id, weight, edge id)
+        tuple for each edge leaving it.
+    -self.ends: list of tuples. The two node ids joined by every edge, by edge id.
+    -self.runs: list of arrays of ints. Grid indices of the corridor cells of
+        every edge, in order from its first end to its second, ends excluded."""
+
+    def __init__(self, maze):
+        """Builds the graph of [maze].
+        -maze: Maze object. Stored in self.maze"""
+
+        self.maze = maze
+        walls = maze.grid.walls
+
+        isNode = self.findNodes()
+        if numpy is not None:
+            self.nodes = numpy.flatnonzero(numpy.frombuffer(isNode, dtype=numpy.uint8)).tolist()
+        else:
+            self.nodes = [index for index in range(len(isNode)) if isNode[index]]
+        self.ids = {index: id for id, index in enumerate(self.nodes)}
+        self.edges = [[] for index in self.nodes]
+        self.ends = []
+        self.runs = []
+
+        traced = set()                  #(node, first cell) of every corridor already traced
+        neighbors = maze.grid.neighbors
+        for start in self.nodes:
+            for first in neighbors(start):
+                if first < 0 or walls[first] or (start, first) in traced:
+                    continue
+
+                previous = start
+                current = first
+                run = array("i")
+                while not isNode[current]:          #Corridor cells have exactly one way on
+                    run.append(current)
+                    for next in neighbors(current):
+                        if next >= 0 and next != previous and not walls[next]:
+                            break
+                    previous, current = current, next
+
+                traced.add((start, first))
+                traced.add((current, previous))
+                if current == start:
+                    continue                        #Corridor loops back to where it started
+
+                a = self.ids[start]
+                b = self.ids[current]
+                edge = len(self.ends)
+                self.ends.append((a, b))
+                self.runs.append(run)
+                self.edges[a].append((b, len(run) + 1, edge))
+                self.edges[b].append((a, len(run) + 1, edge))
+
+    def findNodes(self):
+        """Bytearray with a 1 for every node cell: open cells that do not have
+        exactly two open neighbors, plus the entrance and the exit."""
+
+        maze = self.maze
+        walls = maze.grid.walls
+        counts = maze.grid.neighborCounts()
+
+        if numpy is not None and isinstance(walls, bytearray):
+            isNode = bytearray(((numpy.frombuffer(walls, dtype=numpy.uint8) == 0) &
+                                (numpy.frombuffer(counts, dtype=numpy.uint8) != 2)).astype(numpy.uint8).tobytes())
+        else:
+            isNode = bytearray(1 if not walls[index] and counts[index] != 2 else 0 for index in range(len(walls)))
+
+        isNode[maze.entrance.index] = 1
+        isNode[maze.exit.index] = 1
+        return isNode
+
+    def search(self, start, goal):
+        """A* over the graph from node id [start] to node id [goal]. Corridors
+        are never shorter than the Manhattan distance between their ends, so
+        A_Star's heuristic still finds a shortest path.
+        Yields the node id of every node evaluated, in order. Returns the path
+        as a list of (node id, edge id) steps, the first one being (start, -1),
+        or None if [goal] cannot be reached."""
+
+        cols = self.maze.cols
+        nodes = self.nodes
+        goalX = nodes[goal] % cols
+        goalY = nodes[goal] // cols
+
+        g = {start: 0}
+        parent = {start: (-1, -1)}
+        closed = set()
+        order = 0
+        toVisit = [(0, 0, order, start)]
+
+        while toVisit:
+            current = heappop(toVisit)[-1]
+            if current in closed:
+                continue                #Outdated entry, node was already evaluated
+            closed.add(current)
+            yield current
+
+            if current == goal:
+                steps = []
+                while current != -1:
+                    previous, previousEdge = parent[current]
+                    steps.append((current, previousEdge))
+                    current = previous
+                steps.reverse()
+                return steps
+
+            for neighbor, weight, edge in self.edges[current]:
+                if neighbor in closed:
+                    continue
+                neighborG = g[current] + weight
+                if neighbor not in g or neighborG < g[neighbor]:
+                    g[neighbor] = neighborG
+                    parent[neighbor] = (current, edge)
+                    h = abs(goalX - nodes[neighbor] % cols) + abs(goalY - nodes[neighbor] // cols)
+                    order += 1
+                    heappush(toVisit, (neighborG + h, h, order, neighbor))
+
+        return None
+
+    def expand(self, steps):
+        """Grid indices of every cell along [steps], a path returned by
+        search(), with the corridors of its edges filled in."""
+
+        cells = [self.nodes[steps[0][0]]]
+        for (previous, ignored), (node, edge) in zip(steps, steps[1:]):
+            run = self.runs[edge]
+            cells.extend(run if self.ends[edge][0] == previous else reversed(run))
+            cells.append(self.nodes[node])
+        return cells
+
+    def shortestPath(self, start, goal):
+        """Shortest path between two node cells, as a list of (x, y) tuples with
+        every cell filled in. Empty if [goal] cannot be reached.
+        -start: tuple. (x, y) coordinates of a node cell.
+        -goal: tuple. (x, y) coordinates of a node cell.
+        Raises ValueError if a cell is not a node of the graph."""
+
+        cols = self.maze.cols
+        ids = []
+        for x, y in (start, goal):
+            id = self.ids.get(y * cols + x)
+            if id is None:
+                raise ValueError("Cell " + str((x, y)) + " is not a junction, dead end, entrance or exit")
+            ids.append(id)
+
+        search = self.search(ids[0], ids[1])
+        try:
+            while True:
+                next(search)
+        except StopIteration as stop:
+            steps = stop.value
+        if steps is None:
+            return []
+        return [(index % cols, index // cols) for index in self.expand(steps)]
+
+
+class JunctionSearch(Solver):
+    """Solves a maze by searching its JunctionGraph instead of its cells: A*
+    steps from junction to junction, one corridor at a time, and the path
+    found is then expanded back into cells. Evaluates far fewer nodes than
+    A_Star on mazes made of long corridors.
+    -PATH_STATE: CellState. Used for path from the entrance to the exit.
+    -TO_VISIT_STATE: CellState. Used to show which junctions are in line to
+        be evaluated.
+    -VISITED_STATE: CellState. Used for evaluated junctions."""
+
+    PATH_STATE = CellState.SOLUTION
+    TO_VISIT_STATE = CellState.TO_VISIT
+    VISITED_STATE = CellState.VISITED
+
+    def __init__(self, maze, animate, graph=None, run=True):
+        """The maze itself is not modified, apart from the states used to draw
+        the search.
+        -maze: Maze object. Stored in self.maze
+        -animate: Boolean. Determines whether pathfinding process will be shown.
+            stored in self.animate.
+        -graph: JunctionGraph or None. Graph of [maze], so several solves can
+            share one. None builds it. Stored in self.graph.
+        -run: Boolean. If False, nothing is done until events() is consumed.
+        -self.path: array. Coordinates (as tuples) of the path from the entrance
+            to the exit. Empty if the exit cannot be reached.
+        -self.expanded: int. Number of junctions evaluated by the search."""
+
+        self.maze = maze
+        self.animate = animate
+        self.graph = graph or JunctionGraph(maze)
+        self.path = []
+        self.expanded = 0
+
+        if run:
+            self.play()
+
+    def events(self):
+        """Searches for the path and shows it. Yields an (index, state) pair
+        for every change; see Maze.play()."""
+
+        graph = self.graph
+        nodes = graph.nodes
+        start = graph.ids[self.maze.entrance.index]
+        goal = graph.ids[self.maze.exit.index]
+
+        search = graph.search(start, goal)
+        expanded = 0
+        try:
+            while True:
+                current = next(search)
+                expanded += 1
+                yield self.changeCellColor(nodes[current], self.VISITED_STATE)
+        except StopIteration as stop:
+            steps = stop.value
+        finally:
+            self.expanded += expanded
+
+        if steps is not None:
+            yield from self.displayPath(graph.expand(steps))
+
+    def displayPath(self, cells):
+        """Stores [cells], the grid indices of the path from the entrance to the
+        exit, in self.path and renders them starting from the exit."""
+
+        cols = self.maze.cols
+        self.path = [(index % cols, index // cols) for index in cells]
+        for index in reversed(cells):
+            yield self.changeCellColor(index, self.PATH_STATE)
+
+"""****************************END JUNCTION GRAPH*********************************"""
+
+
+"""*****************************TREE PATH QUERIES*********************************"""
+class TreeQueries:
+    """Answers many path queries on a perfect maze (such as the ones made by
+    Generation.DepthFirst), where the open cells form a tree and there is exactly
+    one path between any two of them. The maze is indexed once: every open cell
+    gets its depth and parent in a tree rooted at the entrance, plus binary
+    lifting tables to find the lowest common ancestor (LCA) of two cells. After
+    that, the length of the path between two cells takes O(log n) time, and the
+    path itself takes O(path length), no matter where the cells are.
+    Cells are given as (x, y) tuples. Nothing is drawn and the maze is not
+    modified. Where NumPy is installed, the lifting tables are built with it.
+    -self.ids: array of ints. Tree id of every grid index, -1 for walls and
+        cells that cannot be reached from the entrance.
+    -self.cells: array of ints. Grid index of every tree id.
+    -self.depth: array of ints. Distance of every tree id from the entrance.
+    -self.up: list of arrays of ints. up[k][i] is the ancestor 2^k levels above
+        tree id i. The entrance is its own parent."""
+
+    def __init__(self, maze):
+        """Indexes [maze]. Raises ValueError if the maze has loops.
+        -maze: Maze object. Stored in self.maze"""
+
+        self.maze = maze
+        walls = maze.grid.walls
+        neighbors = maze.grid.neighbors
+        size = maze.rows * maze.cols
+
+        self.ids = array("i", [-1]) * size
+        self.cells = array("i")
+        self.depth = array("i")
+        parent = array("i")
+
+        start = maze.entrance.index
+        self.ids[start] = 0
+        self.cells.append(start)
+        self.depth.append(0)
+        parent.append(0)
+
+        current = 0
+        while current < len(self.cells):           #Breadth first, self.cells is the queue
+            index = self.cells[current]
+            for neighbor in neighbors(index):
+                if neighbor < 0 or walls[neighbor]:
+                    continue
+                if self.ids[neighbor] != -1:
+                    if self.ids[neighbor] != parent[current]:
+                        raise ValueError("Maze has loops; TreeQueries needs a perfect maze")
+                    continue
+                self.ids[neighbor] = len(self.cells)
+                self.cells.append(neighbor)
+                self.depth.append(self.depth[current] + 1)
+                parent.append(current)
+            current += 1
+
+        self.up = [parent]
+        for k in range(1, max(self.depth).bit_length()):
+            previous = self.up[-1]
+            if numpy is not None:
+                table = numpy.frombuffer(previous, dtype=numpy.int32)
+                level = array("i")
+                level.frombytes(table[table].tobytes())
+            else:
+                level = array("i", [previous[ancestor] for ancestor in previous])
+            self.up.append(level)
+
+    def getId(self, cell):
+        """Tree id of [cell]. Raises ValueError for walls and unreachable cells.
+        -cell: tuple. (x, y) coordinates."""
+
+        x, y = cell
+        if 0 <= x < self.maze.cols and 0 <= y < self.maze.rows:
+            id = self.ids[y * self.maze.cols + x]
+            if id != -1:
+                return id
+        raise ValueError("Cell " + str(cell) + " is not an open cell reachable from the entrance")
+
+    def lowestCommonAncestor(self, a, b):
+        """Tree id of the deepest cell that is an ancestor of both tree ids [a]
+        and [b]. Every path from a to b goes through it."""
+
+        depth = self.depth
+        up = self.up
+
+        if depth[a] < depth[b]:
+            a, b = b, a
+        difference = depth[a] - depth[b]
+        k = 0
+        while difference:                   #Lift a to the depth of b
+            if difference & 1:
+                a = up[k][a]
+            difference >>= 1
+            k += 1
+
+        if a == b:
+            return a
+        for k in range(len(up) - 1, -1, -1):
+            if up[k][a] != up[k][b]:
+                a = up[k][a]
+                b = up[k][b]
+        return up[0][a]
+
+    def distance(self, start, goal):
+        """Number of steps in the path from [start] to [goal].
+        -start: tuple. (x, y) coordinates of the first cell.
+        -goal: tuple. (x, y) coordinates of the last cell."""
+
+        a = self.getId(start)
+        b = self.getId(goal)
+        return self.depth[a] + self.depth[b] - 2 * self.depth[self.lowestCommonAncestor(a, b)]
+
+    def path(self, start, goal):
+        """Cells (as (x, y) tuples) of the path from [start] to [goal], both
+        included."""
+
+        a = self.getId(start)
+        b = self.getId(goal)
+        ancestor = self.lowestCommonAncestor(a, b)
+        parent = self.up[0]
+        cols = self.maze.cols
+
+        up = []
+        while a != ancestor:
+            up.append(self.cells[a])
+            a = parent[a]
+        up.append(self.cells[ancestor])
+
+        down = []
+        while b != ancestor:
+            down.append(self.cells[b])
+            b = parent[b]
+        down.reverse()
+
+        return [(index % cols, index // cols) for index in up + down]
+
+    def distances(self, pairs):
+        """distance() of every (start, goal) pair in [pairs], as a list."""
+
+        return [self.distance(start, goal) for start, goal in pairs]
+
+    def paths(self, pairs):
+        """path() of every (start, goal) pair in [pairs], as a list."""
+
+        return [self.path(start, goal) for start, goal in pairs]
+
+"""***************************END TREE PATH QUERIES******************************"""
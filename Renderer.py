@@ -0,0 +1,181 @@
+import pygame
+from Node import Node
+from Grid import Grid
+
+class Renderer:
+    """Draws a maze's cells onto a pygame surface. A Maze only has a Renderer
+    when it is given a surface; without one, generation and pathfinding run
+    headless and never touch pygame.
+    Animation is batched into frames. Changed cells are drawn right away, but
+    their rectangles are queued and only sent to the display, all at once, when
+    a frame is flushed. Algorithms call step() after every change; a frame is
+    flushed once enough steps have been taken, and frames are capped at FPS.
+    The renderer remembers the state it last drew in every cell, so a grid can
+    be brought up to date by drawing only the cells that changed since.
+    A whole grid is drawn in a single blit: its states are used as the pixels
+    of a palette-indexed surface of one pixel per cell, which is scaled up to
+    the cell width. Only the part of the grid in view is drawn, so mazes larger
+    than the window can be scrolled through and zoomed with setView().
+    -PALETTE: tuple of pygame Color objects. Color of each CellState, indexed
+        by state.
+    -FPS: int. Maximum number of frames shown per second while animating.
+    -FULL_FRAME_CELLS: int. When more cells than this changed, renderChanges()
+        draws the whole frame in one blit instead of cell by cell."""
+
+    PALETTE = (
+        pygame.Color(100, 100, 100),        #WALL: Dark Gray
+        pygame.Color(255, 255, 255),        #PATH: White
+        pygame.Color(255, 0, 0),            #ENTRANCE: Red
+        pygame.Color(255, 140, 0),          #CURRENT: Orange
+        pygame.Color(255, 140, 0),          #TO_VISIT: Orange
+        pygame.Color(0, 200, 150),          #VISITED: Cyan
+        pygame.Color(0, 0, 200),            #SOLUTION: Blue
+    )
+
+    FPS = 60
+
+    FULL_FRAME_CELLS = 4096
+
+    def __init__(self, surface):
+        """
+        -surface: pygame Surface object. Used to draw cells. Stored in self.surface
+        -self.dirty: list of pygame Rect objects. Cells drawn since the last flush.
+        -self.steps: double. Algorithm steps taken since the last flush.
+        -self.clock: pygame Clock object. Keeps frames at FPS.
+        -self.draws: int. Number of draw calls so far: one for every cell drawn
+            on its own, and one for every whole frame.
+        -self.flushes: int. Number of display updates so far.
+        -self.shown: bytearray or None. State last drawn in every cell, indexed
+            like Grid.states. None until a whole grid has been drawn.
+        -self.cols: int. Number of columns of the grid last drawn whole.
+        -self.left: int. Column of the leftmost cell in view.
+        -self.top: int. Row of the topmost cell in view.
+        -self.cellWidth: int. Width and height of a cell, in pixels."""
+
+        self.surface = surface
+        self.dirty = []
+        self.steps = 0
+        self.clock = pygame.time.Clock()
+        self.draws = 0
+        self.flushes = 0
+        self.shown = None
+        self.cols = 0
+        self.left = 0
+        self.top = 0
+        self.cellWidth = Node.NODE_WIDTH
+
+    def setView(self, left, top, cellWidth=None):
+        """Scrolls and zooms the view. The next render draws the whole frame.
+        -left: int. Column of the leftmost cell in view.
+        -top: int. Row of the topmost cell in view.
+        -cellWidth: int or None. Width and height of a cell, in pixels. None
+            keeps the current one."""
+
+        self.left = max(0, left)
+        self.top = max(0, top)
+        if cellWidth is not None:
+            self.cellWidth = max(1, cellWidth)
+        self.shown = None
+
+    def drawCell(self, x, y, state):
+        """Draws cell (x, y) into the surface. Does NOT render it. The cell will be
+        shown next time the display is updated. Returns the area drawn, or None
+        if the cell is out of view.
+        -state: CellState. Determines the color of the cell."""
+
+        if self.shown is not None:
+            self.shown[y * self.cols + x] = state
+
+        width = self.cellWidth
+        left = (x - self.left) * width
+        top = (y - self.top) * width
+        if left < 0 or top < 0 or left >= self.surface.get_width() or top >= self.surface.get_height():
+            return None
+
+        rectangle = pygame.Rect(left, top, width, width)
+        self.surface.fill(Renderer.PALETTE[state], rectangle)
+        self.draws += 1
+        return rectangle
+
+    def queueCell(self, x, y, state):
+        """Draws cell (x, y) and queues it to be rendered on the next flush."""
+
+        rectangle = self.drawCell(x, y, state)
+        if rectangle is not None:
+            self.dirty.append(rectangle)
+
+    def step(self, stepsPerFrame, weight=1.0):
+        """Counts an algorithm step. Flushes a frame once [stepsPerFrame] steps
+        have been taken since the last one.
+        -stepsPerFrame: double. Steps shown in every frame.
+        -weight: double. How much this step counts. 0 lets a change be shown in
+            the same frame as the next one."""
+
+        self.steps += weight
+        if self.steps >= stepsPerFrame:
+            self.flush()
+            self.clock.tick(self.FPS)
+
+    def flush(self):
+        """Renders every queued cell with a single display update."""
+
+        pygame.event.pump()
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
+            self.flushes += 1
+        self.steps = 0
+
+    def renderGrid(self, grid):
+        """Draws every cell of [grid] in view with a single scaled blit and
+        renders at the end.
+        -grid: Grid object."""
+
+        cols = grid.cols
+        rows = grid.rows
+        width = self.cellWidth
+        surfaceWidth, surfaceHeight = self.surface.get_size()
+
+        self.left = min(self.left, cols - 1)
+        self.top = min(self.top, rows - 1)
+        viewCols = min(cols - self.left, -(-surfaceWidth // width))
+        viewRows = min(rows - self.top, -(-surfaceHeight // width))
+        if viewCols * width < surfaceWidth or viewRows * width < surfaceHeight:
+            self.surface.fill(Renderer.PALETTE[0])      #Beyond the edges of the grid
+
+        cells = pygame.image.frombuffer(grid.states, (cols, rows), "P")    #One pixel per cell, no copy
+        cells.set_palette(Renderer.PALETTE)
+        view = cells.subsurface((self.left, self.top, viewCols, viewRows))
+        if width != 1:
+            view = pygame.transform.scale(view, (viewCols * width, viewRows * width))
+        self.surface.blit(view, (0, 0))
+        self.draws += 1
+
+        self.shown = bytearray(grid.states)
+        self.cols = cols
+        pygame.event.pump()
+        pygame.display.update()
+        self.flushes += 1
+        self.dirty = []
+        self.steps = 0
+
+    def renderChanges(self, grid):
+        """Draws only the cells of [grid] whose state differs from the one last
+        drawn, and renders them with a single display update. Draws the whole
+        grid if it was never drawn whole before.
+        -grid: Grid object."""
+
+        if self.shown is None or self.cols != grid.cols or len(self.shown) != len(grid.states):
+            self.renderGrid(grid)
+            return
+
+        states = grid.states
+        cols = self.cols
+        changed = Grid.differences(self.shown, states)
+        if len(changed) > self.FULL_FRAME_CELLS:
+            self.renderGrid(grid)
+            return
+
+        for index in changed:
+            self.queueCell(index % cols, index // cols, states[index])
+        self.flush()
@@ -0,0 +1,369 @@
+"""Local maze service, so game backends can generate and solve mazes without
+running pygame or blocking on generation themselves.
+
+The service speaks JSON lines over a Unix socket (or TCP where Unix sockets are
+not available): every request is one JSON object on its own line, and every
+response is one JSON object on its own line, carrying the same "id" as its
+request. Responses to requests on the same connection come back as they are
+ready, not necessarily in order.
+
+    {"id": 1, "op": "generate", "width": 101, "height": 101, "seed": 7, "generator": "DepthFirst"}
+        -> {"id": 1, "ok": true, "maze": KEY, "cols": 101, "rows": 101,
+            "entrance": [0, 51], "exit": [100, 13], "data": BASE64}
+    {"id": 2, "op": "solve", "maze": KEY, "solver": "A_Star"}
+        -> {"id": 2, "ok": true, "path": [[0, 51], ...], "length": 317, "expanded": 2210}
+    Errors: {"id": 3, "ok": false, "error": "..."}
+
+"data" is the maze in the MazeFile format, base64 encoded. A solve request
+names a maze either by the "maze" key returned by generate, for the most
+recently used mazes the service still holds, or by sending its "data".
+
+Generation and solving run on a pool of worker processes. Solve requests for
+the same maze that arrive within BATCH_WINDOW of each other are merged into a
+single job, which decodes the maze once and runs every solver asked for once.
+
+Load is bounded in two ways. Once MAX_PENDING requests are being worked on,
+further requests are answered right away with a "busy" error instead of being
+queued, so waiting times stay short. And a connection with MAX_IN_FLIGHT
+requests awaiting their response is not read from until one is answered, so
+a single backend cannot flood the service.
+
+Usage:
+    python Service.py --socket /tmp/maze.sock
+    python Service.py --host 127.0.0.1 --port 8765"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import socket
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import Bulk
+import MazeFile
+import Pathfinding
+
+"""ADJUST SERVICE SETTINGS"""
+BATCH_WINDOW = 0.002                #Seconds a solve waits for others on the same maze
+MAX_PENDING = 256                   #Requests worked on at once; more are answered "busy"
+MAX_IN_FLIGHT = 32                  #Unanswered requests per connection before it stops being read
+CACHE_SIZE = 64                     #Mazes kept for solve requests that name them by key
+MAX_CELLS = 4001 * 4001             #Largest maze that can be generated or solved
+MAX_LINE = 64 * 1024 * 1024         #Longest request line, in bytes
+
+SOLVERS = {
+    "A_Star": lambda maze: Pathfinding.A_Star(maze, False, useArrays=True),
+    "HugRightWall": lambda maze: Pathfinding.HugRightWall(maze, False),
+}
+
+
+def checkSize(request, name):
+    """Value of dimension [name] ("width" or "height") of a generate request.
+    Raises ValueError unless it is a whole number; it may be sent as a float,
+    like 101.0, but not as a string, a boolean, or inf."""
+
+    value = request.get(name, 0)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(name.capitalize() + " must be an integer: " + repr(value))
+    return value
+
+
+def checkMaze(data):
+    """Checks that [data] holds a maze the service can solve: a valid MazeFile
+    (see MazeHeader.unpack()) of at most MAX_CELLS cells, with its entrance
+    on the left border and its exit on the right border, as Maze places
+    them. Raises ValueError otherwise. Returns the header."""
+
+    header = MazeFile.MazeHeader.unpack(data)
+    if header.cols * header.rows > MAX_CELLS:
+        raise ValueError("Maze must be at most " + str(MAX_CELLS) + " cells")
+    if header.entrance[0] != 0:
+        raise ValueError("The entrance " + str(header.entrance) + " is not on the left border")
+    if header.exit[0] != header.cols - 1:
+        raise ValueError("The exit " + str(header.exit) + " is not on the right border")
+    return header
+
+
+def generateJob(width, height, seed, generator):
+    """Generates a maze. Runs in a worker process. Returns it as MazeFile bytes."""
+
+    return Bulk.generateOne(width, height, seed, generator)
+
+
+def solveJob(data, solvers):
+    """Solves the maze in MazeFile bytes [data] once with each of [solvers].
+    Runs in a worker process. Returns a dictionary of (path, expanded) tuples,
+    by solver name; paths are lists of [x, y] lists."""
+
+    maze = MazeFile.loads(data)
+    results = {}
+    for name in solvers:
+        maze.clear()
+        solver = SOLVERS[name](maze)
+        expanded = getattr(solver, "expanded", getattr(solver, "steps", 0))
+        results[name] = ([[x, y] for x, y in solver.path], expanded)
+    return results
+
+
+class Batch:
+    """Solve requests waiting to be run as a single job on the same maze.
+    -self.data: bytes. The maze, in the MazeFile format.
+    -self.futures: dictionary. Future of the result of every solver asked for,
+        by solver name. Requests for the same solver share a future."""
+
+    def __init__(self, data):
+        self.data = data
+        self.futures = {}
+
+
+class MazeService:
+    """Handles requests and runs the work they ask for. See the module
+    documentation for the protocol."""
+
+    def __init__(self, workers=None, executor=None, maxPending=MAX_PENDING, maxInFlight=MAX_IN_FLIGHT,
+                 cacheSize=CACHE_SIZE, batchWindow=BATCH_WINDOW):
+        """
+        -workers: int or None. Number of worker processes. None uses one per CPU.
+        -executor: concurrent.futures Executor or None. Runs the work instead of
+            a new pool of [workers] processes. Stored in self.executor
+        -maxPending: int. Requests worked on at once. Stored in self.maxPending
+        -maxInFlight: int. Unanswered requests per connection. Stored in self.maxInFlight
+        -cacheSize: int. Mazes kept by key. Stored in self.cacheSize
+        -batchWindow: double. Seconds a solve waits for others on the same maze.
+            Stored in self.batchWindow
+        -self.mazes: OrderedDict. MazeFile bytes of the mazes kept, by key, from
+            the least to the most recently used.
+        -self.batches: dictionary. Batch waiting to start for every maze key.
+        -self.pending: int. Requests being worked on.
+        -self.jobs: int. Jobs handed to the workers so far.
+        -self.server: asyncio Server object or None. Set by serve().
+        -self.connections: dictionary. Reader of every open connection, by the
+            task serving it."""
+
+        self.executor = executor or ProcessPoolExecutor(max_workers=workers)
+        self.maxPending = maxPending
+        self.maxInFlight = maxInFlight
+        self.cacheSize = cacheSize
+        self.batchWindow = batchWindow
+
+        self.mazes = OrderedDict()
+        self.batches = {}
+        self.pending = 0
+        self.jobs = 0
+        self.server = None
+        self.connections = {}
+
+    async def handle(self, request):
+        """Answers a single request, given as a dictionary. Returns the
+        response as a dictionary. Never raises for a bad request, or for a job
+        that fails; the error is reported in the response instead."""
+
+        response = {"id": request.get("id") if isinstance(request, dict) else None}
+        if self.pending >= self.maxPending:
+            response.update(ok=False, error="busy")
+            return response
+
+        self.pending += 1
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            operation = request.get("op")
+            if operation == "generate":
+                response.update(await self.generate(request))
+            elif operation == "solve":
+                response.update(await self.solve(request))
+            else:
+                raise ValueError("Unknown op: " + str(operation))
+            response["ok"] = True
+        except (ValueError, TypeError, KeyError, RuntimeError) as error:       #RuntimeError: broken worker pool
+            response.update(ok=False, error=str(error))
+        except Exception as error:                                              #Anything else is still answered
+            response.update(ok=False, error=type(error).__name__ + ": " + str(error))
+        finally:
+            self.pending -= 1
+        return response
+
+    async def generate(self, request):
+        """Generates the maze asked for by a generate request."""
+
+        width = checkSize(request, "width")
+        height = checkSize(request, "height")
+        seed = request.get("seed")
+        generator = request.get("generator", "DepthFirst")
+        if width < 3 or height < 3 or width * height > MAX_CELLS:
+            raise ValueError("Maze must be at least 3x3 and at most " + str(MAX_CELLS) + " cells")
+        if generator not in Bulk.GENERATORS:
+            raise ValueError("Unknown generator: " + str(generator))
+        MazeFile.checkSeed(seed)
+
+        data = await self.run(generateJob, width, height, seed, generator)
+        header = MazeFile.MazeHeader.unpack(data)
+        return {"maze": self.keep(data), "cols": header.cols, "rows": header.rows,
+                "entrance": list(header.entrance), "exit": list(header.exit),
+                "data": base64.b64encode(data).decode("ascii")}
+
+    async def solve(self, request):
+        """Solves the maze named by a solve request, in a batch with the other
+        solves of the same maze that arrive in time."""
+
+        solver = request.get("solver", "A_Star")
+        if solver not in SOLVERS:
+            raise ValueError("Unknown solver: " + str(solver))
+
+        if "data" in request:
+            data = base64.b64decode(request["data"])   #Raises ValueError (binascii.Error) if it is not base64
+            checkMaze(data)
+            key = self.keep(data)
+        else:
+            key = request.get("maze")
+            data = self.mazes.get(key)
+            if data is None:
+                raise ValueError("Unknown maze: " + str(key))
+            self.mazes.move_to_end(key)
+
+        batch = self.batches.get(key)
+        if batch is None:
+            batch = self.batches[key] = Batch(data)
+            asyncio.get_running_loop().create_task(self.runBatch(key, batch))
+        future = batch.futures.get(solver)
+        if future is None:
+            future = batch.futures[solver] = asyncio.get_running_loop().create_future()
+
+        path, expanded = await asyncio.shield(future)
+        return {"maze": key, "path": path, "length": max(len(path) - 1, 0), "expanded": expanded}
+
+    async def runBatch(self, key, batch):
+        """Waits batchWindow for more solves of the same maze, then runs them
+        all as a single job and hands every request its result."""
+
+        await asyncio.sleep(self.batchWindow)
+        del self.batches[key]
+        try:
+            results = await self.run(solveJob, batch.data, tuple(batch.futures))
+        except Exception as error:
+            for future in batch.futures.values():
+                future.set_exception(ValueError("Solve failed: " + str(error)))
+            return
+        for solver, future in batch.futures.items():
+            future.set_result(results[solver])
+
+    async def run(self, job, *arguments):
+        """Runs [job] on the workers and waits for its result."""
+
+        self.jobs += 1
+        return await asyncio.get_running_loop().run_in_executor(self.executor, job, *arguments)
+
+    def keep(self, data):
+        """Stores the maze in MazeFile bytes [data], dropping the least recently
+        used maze if there are too many. Returns its key, a hash of [data]."""
+
+        key = hashlib.sha256(data).hexdigest()[:32]
+        self.mazes[key] = data
+        self.mazes.move_to_end(key)
+        if len(self.mazes) > self.cacheSize:
+            self.mazes.popitem(last=False)
+        return key
+
+    async def connection(self, reader, writer):
+        """Serves a single connection until the other side closes it."""
+
+        slots = asyncio.Semaphore(self.maxInFlight)
+        lock = asyncio.Lock()
+        tasks = set()
+        self.connections[asyncio.current_task()] = reader
+
+        async def answer(line):
+            try:
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"id": None, "ok": False, "error": "Request is not valid JSON"}
+                else:
+                    response = await self.handle(request)
+                async with lock:
+                    writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+                    await writer.drain()
+            except ConnectionError:
+                pass                    #Other side is gone; nothing to answer to
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                await slots.acquire()           #Stops reading while too many requests are unanswered
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break                       #Line longer than MAX_LINE, or connection lost
+                if not line:
+                    break
+                if not line.strip():
+                    slots.release()
+                    continue
+                task = asyncio.get_running_loop().create_task(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            del self.connections[asyncio.current_task()]
+            writer.close()
+
+    async def serve(self, path=None, host="127.0.0.1", port=0):
+        """Starts listening, on the Unix socket at [path] if given, on TCP
+        [host]:[port] otherwise. Returns the asyncio Server, also stored in
+        self.server."""
+
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.connection, path, limit=MAX_LINE)
+        else:
+            self.server = await asyncio.start_server(self.connection, host, port, limit=MAX_LINE)
+        return self.server
+
+    async def close(self):
+        """Stops listening, closes every connection once its unanswered
+        requests are answered, and shuts the workers down."""
+
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for reader in self.connections.values():
+            reader.feed_eof()               #Ends the connection after its last request
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        self.executor.shutdown()
+
+
+async def serveForever(service, path, host, port):
+    await service.serve(path, host, port)
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Serve maze generation and solving over JSON lines.")
+    parser.add_argument("--socket", default=None, help="Unix socket to listen on")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host to listen on, without --socket")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on, without --socket")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, one per CPU by default")
+    options = parser.parse_args(arguments)
+
+    if options.socket is not None and not hasattr(socket, "AF_UNIX"):
+        parser.error("Unix sockets are not available here; use --host and --port")
+
+    service = MazeService(workers=options.workers)
+    try:
+        asyncio.run(serveForever(service, options.socket, options.host, options.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Endless maze made of chunks, for modes where the player can keep walking.
+
+The world is an unbounded grid of cells addressed by (x, y), negative
+coordinates included, cut into square chunks of chunkSize cells. As in a Maze,
+cells with both coordinates odd are always open and walls run along even
+coordinates. A chunk is generated the first time one of its cells is read,
+from the world seed and the chunk's coordinates only, so the world comes out
+the same whatever order it is explored in.
+
+Every chunk is a perfect maze on its own. The wall column on its left and the
+wall row above it are its seams with its neighbors; each seam gets a single
+opening, placed by hashing the world seed and the seam's position, so the
+chunks on both sides of a seam agree on it without either one having to be
+generated first.
+
+Only the most recently used chunks are kept, up to cacheSize of them. Older
+ones are dropped and generated again if they are needed again, so memory
+stays flat no matter how far the world is explored."""
+
+from collections import OrderedDict
+from heapq import heappush
+from heapq import heappop
+
+from Grid import Grid
+import Bulk
+import Generation
+
+
+class World:
+    """Endless maze. See the module documentation.
+    -CHUNK_SIZE: int. Default width and height of a chunk, in cells. Must be even.
+    -CACHE_SIZE: int. Default number of chunks kept in memory.
+    -GENERATOR: RowGenerator subclass. Default algorithm used to generate chunks.
+    -MOVES: tuple. (x, y) steps to the four neighbors of a cell."""
+
+    CHUNK_SIZE = 32
+    CACHE_SIZE = 64
+    GENERATOR = Generation.Eller
+
+    MOVES = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+    def __init__(self, seed, chunkSize=CHUNK_SIZE, cacheSize=CACHE_SIZE, generator=None):
+        """
+        -seed: int. Seed of the world. Stored in self.seed
+        -chunkSize: int. Width and height of a chunk, in cells. Even and at least
+            4. Stored in self.chunkSize
+        -cacheSize: int. Number of chunks kept in memory. Stored in self.cacheSize
+        -generator: RowGenerator subclass or None. Algorithm used to generate
+            chunks. None uses GENERATOR. Stored in self.generator
+        -self.chunks: OrderedDict. Walls of the chunks in memory, keyed by chunk
+            coordinates, from the least to the most recently used. Each is a
+            bytearray of chunkSize * chunkSize cells, 1 for walls.
+        -self.generated: int. Number of chunks generated so far, counting
+            chunks generated again after being dropped.
+        -self.expanded: int. Number of cells evaluated by the last findPath()."""
+
+        if chunkSize < 4 or chunkSize % 2:
+            raise ValueError("Chunk size must be even and at least 4: " + str(chunkSize))
+        if cacheSize < 1:
+            raise ValueError("Cache size must be at least 1: " + str(cacheSize))
+
+        self.seed = seed
+        self.chunkSize = chunkSize
+        self.cacheSize = cacheSize
+        self.generator = generator or self.GENERATOR
+
+        self.chunks = OrderedDict()
+        self.generated = 0
+        self.expanded = 0
+
+    def derive(self, *parts):
+        """63 bit integer hashed from the world seed and [parts], with
+        Bulk.deriveSeed(). Used to seed chunks and to place seam openings."""
+
+        return Bulk.deriveSeed(self.seed, ":".join(str(part) for part in parts))
+
+    def chunkOf(self, x, y):
+        """Coordinates of the chunk holding cell (x, y)."""
+
+        return x // self.chunkSize, y // self.chunkSize
+
+    def chunk(self, chunkX, chunkY):
+        """Walls of chunk (chunkX, chunkY), generating it if it is not in memory.
+        Marks it as the most recently used chunk, dropping the least recently
+        used one if the cache is full."""
+
+        key = (chunkX, chunkY)
+        walls = self.chunks.get(key)
+        if walls is not None:
+            self.chunks.move_to_end(key)
+            return walls
+
+        walls = self.generateChunk(chunkX, chunkY)
+        self.chunks[key] = walls
+        if len(self.chunks) > self.cacheSize:
+            self.chunks.popitem(last=False)
+        return walls
+
+    def generateChunk(self, chunkX, chunkY):
+        """Generates the walls of chunk (chunkX, chunkY). The chunk is the top
+        left chunkSize x chunkSize cells of a maze one cell larger, whose right
+        column and bottom row belong to the next chunks instead. Its left column
+        and top row are the seams, opened once each."""
+
+        size = self.chunkSize
+        rows = self.generator.generateRows(size + 1, size + 1, self.derive("chunk", chunkX, chunkY))
+
+        walls = bytearray()
+        for y, row in zip(range(size), rows):
+            walls += row[:size]
+
+        half = size // 2
+        west = 1 + 2 * (self.derive("west", chunkX, chunkY) % half)
+        north = 1 + 2 * (self.derive("north", chunkX, chunkY) % half)
+        walls[west * size] = 0
+        walls[north] = 0
+
+        self.generated += 1
+        return walls
+
+    def isWall(self, x, y):
+        """Checks if cell (x, y) is a wall."""
+
+        size = self.chunkSize
+        chunkX, localX = divmod(x, size)
+        chunkY, localY = divmod(y, size)
+        return self.chunk(chunkX, chunkY)[localY * size + localX] == 1
+
+    def view(self, x, y, cols, rows):
+        """Copies the walls of the [cols] x [rows] cells whose top left cell is
+        (x, y) into a new Grid, for example to draw what is around the player.
+        Cells on the edges of the grid are not necessarily walls."""
+
+        size = self.chunkSize
+        grid = Grid(cols, rows)
+
+        for row in range(rows):
+            chunkY, localY = divmod(y + row, size)
+            col = 0
+            while col < cols:
+                chunkX, localX = divmod(x + col, size)
+                count = min(size - localX, cols - col)
+                start = localY * size + localX
+                grid.walls[row * cols + col:row * cols + col + count] = self.chunk(chunkX, chunkY)[start:start + count]
+                col += count
+
+        grid.markVisited()
+        grid.clearStates()
+        return grid
+
+    def findPath(self, start, goal, limit=None):
+        """Finds a shortest path between two cells with A*, generating chunks
+        as the search reaches them. Works across any number of chunk borders.
+        Chunks reached by the search are held on to until it ends, even if
+        they drop out of the cache, so a search spanning more chunks than the
+        cache holds does not generate them over and over. Like the rest of the
+        search's state, they take memory in proportion to the area explored.
+        -start: tuple. (x, y) coordinates of the first cell.
+        -goal: tuple. (x, y) coordinates of the last cell.
+        -limit: int or None. Give up after evaluating this many cells. None
+            searches until the goal is found; since every chunk is joined to its
+            neighbors, every open cell can be reached.
+        Returns the path as a list of (x, y) tuples from start to goal, or an
+        empty list if either cell is a wall or the limit was hit."""
+
+        size = self.chunkSize
+        reached = {}                    #Chunks used by this search
+
+        def isWall(x, y):
+            chunkX, localX = divmod(x, size)
+            chunkY, localY = divmod(y, size)
+            walls = reached.get((chunkX, chunkY))
+            if walls is None:
+                walls = reached[(chunkX, chunkY)] = self.chunk(chunkX, chunkY)
+            return walls[localY * size + localX] == 1
+
+        self.expanded = 0
+        if isWall(*start) or isWall(*goal):
+            return []
+
+        goalX, goalY = goal
+        h = abs(goalX - start[0]) + abs(goalY - start[1])
+        order = 0
+        toVisit = [(h, h, order, start)]
+        g = {start: 0}
+        parent = {start: None}
+        closed = set()
+
+        while toVisit:
+            current = heappop(toVisit)[-1]
+            if current in closed:
+                continue                #Outdated entry, cell was already evaluated
+            closed.add(current)
+
+            if current == goal:
+                self.expanded = len(closed)     #Every cell evaluated was closed
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parent[current]
+                path.reverse()
+                return path
+            if limit is not None and len(closed) >= limit:
+                break
+
+            x, y = current
+            neighborG = g[current] + 1
+            for moveX, moveY in self.MOVES:
+                neighbor = (x + moveX, y + moveY)
+                if neighbor in closed or isWall(*neighbor):
+                    continue
+
+                if neighbor not in g or neighborG < g[neighbor]:
+                    g[neighbor] = neighborG
+                    parent[neighbor] = current
+
+                    h = abs(goalX - neighbor[0]) + abs(goalY - neighbor[1])
+                    order += 1
+                    heappush(toVisit, (neighborG + h, h, order, neighbor))
+
+        self.expanded = len(closed)
+        return []